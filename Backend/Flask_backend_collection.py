@@ -1,38 +1,48 @@
 from flask import Flask, jsonify, make_response, request
-from pymongo import MongoClient
+import pymongo
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
 import os
+import threading
 import time
+import weakref
 from bson.objectid import ObjectId
 from dotenv import load_dotenv
 import datetime
 
+import http_cache
+import metrics
+import scoring
+from athletes import AthleteRegistry
+from combine import publish_pipeline, standings_pipeline
+from http_cache import compress_response, conditional, data_versions, set_version_source
+from ingest import DeltaError, build_game_updates
+from leaderboard import RankedRows, load_leaderboard_rows, parse_leaderboard_args
+from reads import (DocReader, batch_cursor_header, parse_read_args, parse_resources,
+                   read_response, resource_args)
+from roster import RosterError, diff_roster, validate_players
+from shared_leaderboard import DatabaseVersions, SharedLeaderboard, bump_shared_versions
+from simulate import SOURCE_COLLECTIONS, ScenarioError, StatTables, parse_scenarios, simulate
+from snapshots import SnapshotStore, parse_as_of
+from wire import JSONProvider, dumps, negotiate, render
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
 app = Flask(__name__)
-
-# MongoDB connection with retry logic
+app.json = JSONProvider(app)                # orjson when installed, see wire.py
+app.before_request(metrics.start_request_timer)
+app.after_request(metrics.record_request)   # after_request hooks run last-registered first,
+app.after_request(compress_response)        # so the latency includes compression
+
+# MongoDB client, shared by every request. PyMongo only connects on first use,
+# so the app starts serving (/healthz) without waiting for Mongo; /readyz
+# reports whether Mongo is reachable.
 def get_mongo_connection():
-    database_url = os.getenv("DATABASE_URL")
-    max_retries = 5
-    retry_delay = 2  # seconds
-    
-    for attempt in range(max_retries):
-        try:
-            client = MongoClient(database_url, serverSelectionTimeoutMS=5000)
-            # Verify connection
-            client.admin.command('ping')
-            print(f"✓ MongoDB connected successfully")
-            return client
-        except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"⚠ MongoDB connection failed (attempt {attempt + 1}/{max_retries}): {e}")
-                time.sleep(retry_delay)
-            else:
-                print(f"✗ Failed to connect to MongoDB after {max_retries} attempts")
-                raise
+    return MongoClient(os.getenv("DATABASE_URL"), serverSelectionTimeoutMS=5000, connect=False,
+                       event_listeners=[metrics.mongo_listener])
 
 client = get_mongo_connection()
-db = client["softball"]
+db = client[os.getenv("MONGO_DB_NAME", "softball")]
 collection1 = db["pitching_players"]   # pitching
 collection2 = db["players_hitting"]    # hitting
 collection3 = db["players"]            # combined
@@ -40,246 +50,526 @@ player_info = db["player_info"]
 mvp_points = db["MVP_points"]
 win_points = db["Win_points"]
 users_collection = db["login"]
-
-# Points values
-hitting_values = {
-    "Single": 10, "Double": 20, "Triple": 30, "Home Run": 40,
-    "Stolen Base": 10, "Caught Stealing": -10,
-    "Walk": 10, "HBP": 8, "Sacrifice Fly/Bunt": 10
+ingested_games = db["ingested_games"]  # game_ids already applied by /api/games
+registry = AthleteRegistry(db)         # canonical AthleteIDs, see athletes.py
+snapshots = SnapshotStore(db)          # leaderboard history, see snapshots.py
+
+# --- Indexes ---
+# Declared here and created in the background at startup, once Mongo is
+# reachable; create_indexes is a no-op for indexes that already exist.
+def athlete_indexes():
+    return [
+        IndexModel([("Athlete", ASCENDING)], unique=True, name="Athlete_unique"),
+        # documents get their AthleteID on the next recompute, so skip those without one
+        IndexModel([("AthleteID", ASCENDING)], unique=True, name="AthleteID_unique",
+                   partialFilterExpression={"AthleteID": {"$exists": True}}),
+    ]
+
+required_indexes = {
+    collection1: athlete_indexes(),
+    collection2: athlete_indexes(),
+    collection3: athlete_indexes() + [IndexModel([("TotalPoints", DESCENDING)], name="TotalPoints_desc")],
+    mvp_points: athlete_indexes(),
+    win_points: athlete_indexes(),
+    player_info: [IndexModel([("AthleteID", ASCENDING)], name="AthleteID")],
+    users_collection: [IndexModel([("username", ASCENDING)], unique=True, name="username_unique")],
+    registry.athletes: [IndexModel([("aliases", ASCENDING)], unique=True, name="aliases_unique")],
+    snapshots.snapshots: [IndexModel([("created_at", DESCENDING)], name="created_at_desc")],
 }
-pitching_values = {"out": 4, "allowed run": -10}
 
+def ensure_indexes():
+    for collection, indexes in required_indexes.items():
+        try:
+            collection.create_indexes(indexes)
+        except OperationFailure as e:
+            # e.g. duplicate athletes already stored; the app still works without it
+            print(f"⚠ Could not create indexes on {collection.name}: {e}")
 
-# --- Helper functions ---
+indexes_ready = threading.Event()
 
-def calculate_outs(doc):
-    ip = doc.get("IP", 0)
+def ensure_indexes_when_reachable(max_delay=30):
+    delay = 1
+    while True:
+        try:
+            client.admin.command("ping")
+            break
+        except Exception as e:
+            print(f"⚠ MongoDB not reachable yet, retrying in {delay}s: {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+    print("✓ MongoDB connected successfully")
+    ensure_indexes()
+    indexes_ready.set()
+
+threading.Thread(target=ensure_indexes_when_reachable, name="ensure-indexes", daemon=True).start()
+
+# /readyz pings Mongo at most once per READINESS_TTL seconds
+READINESS_TTL = float(os.getenv("READINESS_TTL", 5))
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", 1))
+readiness_lock = threading.Lock()
+readiness = {"checked": None, "error": "not checked yet"}
+
+def mongo_readiness():
+    """(ok, error) from the last ping, refreshed when older than READINESS_TTL."""
+    checked = readiness["checked"]
+    if checked is None or time.monotonic() - checked >= READINESS_TTL:
+        with readiness_lock:
+            checked = readiness["checked"]
+            if checked is None or time.monotonic() - checked >= READINESS_TTL:
+                try:
+                    with pymongo.timeout(READINESS_TIMEOUT):
+                        client.admin.command("ping")
+                    readiness["error"] = None
+                except Exception as e:
+                    readiness["error"] = str(e)
+                readiness["checked"] = time.monotonic()
+    return readiness["error"] is None, readiness["error"]
+
+# Fields each calculator reads, so recomputes only pull what they need
+hitting_fields = scoring.HITTING_COLUMNS
+pitching_fields = scoring.PITCHING_COLUMNS
+
+# Number of UpdateOne operations sent per bulk_write during a recompute
+RECOMPUTE_BATCH_SIZE = int(os.getenv("RECOMPUTE_BATCH_SIZE", 1000))
 
-    try:
-        ip = float(ip)
-    except (ValueError, TypeError):
-        ip = 0
 
-    whole = int(ip)
-    decmial = ip-whole
-    decmial = int(round(decmial * 10))
-    outs = whole*3 + decmial
-    return outs
+# --- Helper functions ---
 
-def calculate_pitching_points(doc):
-    outs = int(calculate_outs(doc))
+def recompute_points(collection, fields, score, batch_size=RECOMPUTE_BATCH_SIZE):
+    """
+    Recalculate the stored "Points" of every document in `collection` with the
+    vectorized scorer `score` and write the changed ones back with batched
+    bulk_write calls.
+    """
+    start = time.perf_counter()
+    operation = f"recompute_{collection.name}"
+    projection = {field: 1 for field in fields + ["Points"]}
+    with metrics.timed(operation, "read"):
+        docs = list(collection.find({}, projection))
+    with metrics.timed(operation, "score"):
+        all_points = score(docs).tolist()
+    ops = []
+    matched = modified = batches = 0
+
+    write_start = time.perf_counter()
+    for doc, points in zip(docs, all_points):
+        if doc.get("Points") == points:
+            continue
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"Points": points}}))
+        if len(ops) >= batch_size:
+            result = collection.bulk_write(ops, ordered=False)
+            matched += result.matched_count
+            modified += result.modified_count
+            batches += 1
+            ops = []
+
+    if ops:
+        result = collection.bulk_write(ops, ordered=False)
+        matched += result.matched_count
+        modified += result.modified_count
+        batches += 1
+    metrics.PHASE_LATENCY.labels(operation, "write").observe(time.perf_counter() - write_start)
+
+    return {
+        "matched": matched,
+        "modified": modified,
+        "batches": batches,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+def batch_size_from_request():
+    try:
+        return max(1, int(request.args.get("batch_size", RECOMPUTE_BATCH_SIZE)))
+    except ValueError:
+        return RECOMPUTE_BATCH_SIZE
+
+# --- Leaderboard snapshot ---
+# The joined, ranked leaderboard is built once and kept in memory until one of
+# the write routes calls mark_changed(). Under gunicorn (SERVING_MODE=production,
+# see gunicorn.conf.py) a builder process publishes it to a shared memory-mapped
+# file instead, and every worker serves that file under the versions it was
+# built from. All other ETags follow the shared `data_versions` collection
+# (which csv_reader.py bumps too) and this process's own writes.
+SERVING_MODE = os.getenv("SERVING_MODE", "development")
+database_versions = DatabaseVersions(db, data_versions)
+shared_leaderboard = SharedLeaderboard(database_versions) if SERVING_MODE == "production" else None
+set_version_source(database_versions)
+
+leaderboard_lock = threading.Lock()
+leaderboard_snapshot = None     # pre-encoded JSON body
+leaderboard_ranked = None       # the same rows as RankedRows, for filtered queries
+leaderboard_generation = 0      # bumped on every invalidation
+leaderboard_bodies = weakref.WeakKeyDictionary()  # RankedRows -> {format: (body, mimetype)}
+
+def invalidate_leaderboard():
+    global leaderboard_snapshot, leaderboard_ranked, leaderboard_generation
+    with leaderboard_lock:
+        leaderboard_generation += 1
+        leaderboard_snapshot = None
+        leaderboard_ranked = None
+
+def mark_changed(*collections):
+    """Called by every write route: bumps the data versions used for ETags."""
+    names = [c.name for c in collections]
+    data_versions.bump(*names)
+    try:
+        bump_shared_versions(db, names)
+    except Exception as e:
+        # the write itself went through; only other workers' caches lag behind
+        print(f"⚠ Could not bump shared data versions: {e}")
+    invalidate_leaderboard()
+
+def get_leaderboard_snapshot():
+    snapshot = leaderboard_snapshot
+    if snapshot is not None:
+        return snapshot
+
+    generation = leaderboard_generation
+    with metrics.timed("leaderboard", "build"):
+        rows = load_leaderboard_rows(db)
+    return cache_leaderboard_snapshot(rows, generation)[0]
+
+def cache_leaderboard_snapshot(rows, generation):
+    """
+    Encode `rows` and keep them, unless a write happened since `generation`
+    was read; returns (JSON body, RankedRows), both None if `rows` is empty.
+    """
+    global leaderboard_snapshot, leaderboard_ranked
+    with metrics.timed("leaderboard", "encode"):
+        snapshot = dumps(rows) if rows else None
+    ranked = RankedRows(rows) if rows else None
+    with leaderboard_lock:
+        if generation == leaderboard_generation:
+            leaderboard_snapshot = snapshot
+            leaderboard_ranked = ranked
+    return snapshot, ranked
+
+def get_ranked_rows():
+    """RankedRows of the current leaderboard, or None if it is empty."""
+    if shared_leaderboard:
+        ranked = shared_leaderboard.ranked()
+        if ranked is not False:
+            return ranked
+    ranked = leaderboard_ranked
+    if ranked is None and get_leaderboard_snapshot():
+        ranked = leaderboard_ranked
+    return ranked
+
+def leaderboard_query_response(query, ranked, fmt="json"):
+    if ranked is None:
+        return jsonify({"error": "No leaderboard data available"}), 404
+    total, rows = ranked.query(query)
+    response = format_response(rows, fmt)
+    response.headers["X-Total-Count"] = str(total)
+    return response
+
+def leaderboard_body(ranked, fmt):
+    """The whole leaderboard in a format other than JSON, encoded once per snapshot."""
+    with leaderboard_lock:
+        bodies = leaderboard_bodies.setdefault(ranked, {})
+    if fmt not in bodies:
+        with metrics.timed("leaderboard", "encode"):
+            bodies[fmt] = render(ranked.rows, fmt)
+    return bodies[fmt]
+
+def format_response(data, fmt):
+    """Response with `data` (rows, or a dict of rows) in one of the formats of wire.py."""
+    body, mimetype = render(data, fmt)
+    return app.response_class(body, mimetype=mimetype)
+
+# GET resources by name -> (collection, DocReader options), for the stat routes and /api/batch
+read_resources = {
+    "points": (collection3, {}),
+    "hittingstats": (collection2, {"score": scoring.hitting_points, "score_fields": hitting_fields}),
+    "pitchingstats": (collection1, {"score": scoring.pitching_points, "score_fields": pitching_fields}),
+    "mvp": (mvp_points, {}),
+    "win": (win_points, {}),
+    "player_info": (player_info, {"keep_id": True}),
+}
 
+def serve_resource(name):
+    collection, reader_options = read_resources[name]
+    return serve_reads(collection, **reader_options)
+
+def serve_reads(collection, **reader_options):
+    """Serve a collection with the fields/limit/cursor/format query options (see reads.py)."""
     try:
-        er = int(doc.get("ER", 0))
-    except (ValueError, TypeError):
-        er = 0
-
-    return outs * pitching_values["out"] + er * pitching_values["allowed run"]
-
-def calculate_hitting_points(doc):
-    return (
-        doc.get("1B", 0) * hitting_values["Single"] +
-        doc.get("2B", 0) * hitting_values["Double"] +
-        doc.get("3B", 0) * hitting_values["Triple"] +
-        doc.get("HR", 0) * hitting_values["Home Run"] +
-        doc.get("SB", 0) * hitting_values["Stolen Base"] +
-        doc.get("CS", 0) * hitting_values["Caught Stealing"] +
-        doc.get("BB", 0) * hitting_values["Walk"] +
-        doc.get("HP", 0) * hitting_values["HBP"] +
-        (doc.get("SF", 0) + doc.get("SH", 0)) * hitting_values["Sacrifice Fly/Bunt"]
-    )
+        params = parse_read_args(request.args, request.accept_mimetypes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return read_response(DocReader(collection, params, **reader_options))
 
 # --- Pitching Stats ---
 @app.route("/api/pitchingstats", methods=["GET"])
+@conditional("pitching_players")
 def get_pitching_stats():
-    docs = list(collection1.find({}))
-    result = []
-    for doc in docs:
-        doc_copy = doc.copy()
-        doc_copy.pop("_id", None)
-        doc_copy["Points"] = calculate_pitching_points(doc)
-        result.append(doc_copy)
-    return jsonify(result)
+    return serve_resource("pitchingstats")
 
 @app.route("/api/pitchingstats", methods=["POST"])
 def update_pitching_stats():
-    docs = list(collection1.find({}))
-    for doc in docs:
-        doc_id = doc["_id"]
-        points = calculate_pitching_points(doc)
-        collection1.update_one({"_id": doc_id}, {"$set": {"Points": points}})
-    return jsonify({"status": "Pitching points updated"}), 200
+    stats = recompute_points(collection1, pitching_fields, scoring.pitching_points,
+                             batch_size_from_request())
+    mark_changed(collection1)
+    return jsonify({"status": "Pitching points updated", **stats}), 200
 
 # --- Hitting Stats ---
 @app.route("/api/hittingstats", methods=["GET"])
+@conditional("players_hitting")
 def get_hitting_stats():
-    docs = list(collection2.find({}))
-    result = []
-    for doc in docs:
-        doc_copy = doc.copy()
-        doc_copy.pop("_id", None)
-        doc_copy["Points"] = calculate_hitting_points(doc)
-        result.append(doc_copy)
-    return jsonify(result)
+    return serve_resource("hittingstats")
 
 @app.route("/api/hittingstats", methods=["POST"])
 def update_hitting_stats():
-    docs = list(collection2.find({}))
-    for doc in docs:
-        doc_id = doc["_id"]
-        points = calculate_hitting_points(doc)
-        collection2.update_one({"_id": doc_id}, {"$set": {"Points": points}})
-    return jsonify({"status": "Hitting points updated"}), 200
+    stats = recompute_points(collection2, hitting_fields, scoring.hitting_points,
+                             batch_size_from_request())
+    mark_changed(collection2)
+    return jsonify({"status": "Hitting points updated", **stats}), 200
 
 # --- MVP Points ---
 @app.route("/api/mvp", methods=["GET"])
+@conditional("MVP_points")
 def get_MVP_points():
-    docs = list(mvp_points.find({}))
-    result = []
-    for doc in docs:
-        doc_copy = doc.copy()
-        doc_copy.pop("_id", None)
-        result.append(doc_copy)
-    return jsonify(result)
+    return serve_resource("mvp")
 
 # --- Win Points ---
 @app.route("/api/win", methods=["GET"])
+@conditional("Win_points")
 def get_WIN_points():
-    docs = list(win_points.find({}))
-    result = []
-    for doc in docs:
-        doc_copy = doc.copy()
-        doc_copy.pop("_id", None)
-        result.append(doc_copy)
-    return jsonify(result)
+    return serve_resource("win")
 
 # --- Combined Points ---
 @app.route("/api/points", methods=["GET"])
+@conditional("players")
 def get_combined_points():
-    docs = list(collection3.find({}))
-    result = []
-    for doc in docs:
-        doc_copy = doc.copy()
-        doc_copy.pop("_id", None)
-        result.append(doc_copy)
-    return jsonify(result)
+    if request.args.get("as_of"):
+        return get_points_as_of(request.args["as_of"])
+    return serve_resource("points")
+
+def get_points_as_of(value):
+    """Standings from the leaderboard snapshot in effect at `value`."""
+    try:
+        fmt = negotiate(request.args, request.accept_mimetypes)
+        snapshot = snapshots.find(parse_as_of(value))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if snapshot is None:
+        return jsonify({"error": "No snapshot at or before as_of"}), 404
+
+    names = {d["_id"]: d["name"] for d in
+             registry.athletes.find({"_id": {"$in": snapshot["athlete_ids"]}}, {"name": 1})}
+    result = [
+        {"AthleteID": aid, "Athlete": names.get(aid), "TotalPoints": points, "Rank": rank}
+        for aid, points, rank in zip(snapshot["athlete_ids"], snapshot["total_points"], snapshot["ranks"])
+    ]
+    response = format_response(result, fmt)
+    response.headers["X-Snapshot-Version"] = str(snapshot["_id"])
+    return response
+
+@app.route("/api/points/snapshots", methods=["GET"])
+@conditional("players")
+def get_point_snapshots():
+    try:
+        fmt = negotiate(request.args, request.accept_mimetypes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return format_response(snapshots.versions(), fmt)
+
+# source collection -> field it adds to the combined document
+combine_sources = [
+    (collection1, "PitchingPoints"),
+    (collection2, "HittingPoints"),
+    (mvp_points, "MVPPoints"),
+    (win_points, "WINPoints"),
+]
+
+def stamp_athlete_ids():
+    """Set missing AthleteIDs on the sources and player_info; returns the collections changed."""
+    stamped = [c for c, _ in combine_sources if registry.stamp(c)]
+    if registry.stamp(player_info, name_field="name"):
+        stamped.append(player_info)
+    if stamped:
+        mark_changed(*stamped)  # their GET routes and caches must not serve the unstamped documents
+    return stamped
 
 @app.route("/api/points", methods=["POST"])
 def update_combined_points():
-    combined = {}
-
-    # Pull pitching points
-    for doc in collection1.find({}):
-        name = doc.get("Athlete")
-        if not name:
-            continue
-
-        pitching_points = doc.get("Points", 0)
-
-        try:
-            pitching_points = int(pitching_points)
-        except ValueError:
-            pitching_points = 0
-
-        combined[name] = {
-            "Athlete": name,
-            "PitchingPoints": pitching_points,
-            "HittingPoints": 0,  
-            "MVPPoints": 0,
-            "WINPoints" : 0
-
-        }
-        
+    # make sure every document carries its AthleteID before joining on it
+    with metrics.timed("combine", "stamp"):
+        stamp_athlete_ids()
 
-    # Pull hitting points
-    for doc in collection2.find({}):
-        name = doc.get("Athlete")
-        if not name:
-            continue
+    # Score, sum and rank inside MongoDB into a staging collection (see combine.py)
+    staging = db[f"{collection3.name}_staging_{ObjectId()}"]
+    try:
+        with metrics.timed("combine", "join"):
+            collection1.aggregate(standings_pipeline(
+                [(c.name, field) for c, field in combine_sources], staging.name))
+
+        # Store the standings as a snapshot; only their three columns are read back
+        with metrics.timed("combine", "snapshot"):
+            standings = snapshots.read_standings(staging)
+            version, base = snapshots.record_standings(standings)
+
+        # Diff against the baseline snapshot and $out over the live collection
+        with metrics.timed("combine", "swap"):
+            staging.aggregate(publish_pipeline(
+                snapshots.snapshots.name, base["_id"] if base else None, collection3.name))
+    finally:
+        staging.drop()
+
+    mark_changed(collection3)
+    return jsonify({"status": "Combined points updated", "count": len(standings["ranks"]), "snapshot": version}), 200
+
+# --- What-if scoring (alternative point values, see simulate.py) ---
+simulation_tables = (None, None)  # (data versions they were loaded at, StatTables)
+
+def get_stat_tables():
+    """The roster's stat matrices, reloaded only when a source collection has changed."""
+    global simulation_tables
+    versions = http_cache.version_source.etag(SOURCE_COLLECTIONS)
+    loaded_at, tables = simulation_tables
+    if tables is None or loaded_at != versions:
+        # StatTables only reads stamped documents; stamping bumps the versions it changed
+        if stamp_athlete_ids():
+            versions = http_cache.version_source.etag(SOURCE_COLLECTIONS)
+        with metrics.timed("simulate", "load"):
+            tables = StatTables.load(db)
+        simulation_tables = (versions, tables)
+    return tables
+
+@app.route("/api/points/simulate", methods=["POST"])
+def simulate_points():
+    data = request.get_json(silent=True)
+    if not data or "scenarios" not in data:
+        return jsonify({"error": "Expected JSON: { scenarios: [...], limit: ... }"}), 400
+
+    limit = data.get("limit")
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 1):
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    try:
+        scenarios = parse_scenarios(data["scenarios"])
+    except ScenarioError as e:
+        return jsonify({"error": str(e)}), 400
 
-        hitting_points = doc.get("Points", 0)
+    start = time.perf_counter()
+    tables = get_stat_tables()
+    with metrics.timed("simulate", "score"):
+        result = simulate(tables, scenarios, limit)
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return jsonify(result), 200
 
-        try:
-            hitting_points = int(hitting_points)
-        except ValueError:
-            hitting_points = 0
-
-        if name in combined:
-            combined[name]["HittingPoints"] = hitting_points
-        else:
-            combined[name] = {
-                "Athlete": name,
-                "PitchingPoints": 0,
-                "HittingPoints": hitting_points
-            }
-
-    for doc in mvp_points.find({}):
-        name = doc.get("Athlete")
-        if not name:
-            continue
-
-        mvp_point = doc.get("Total MVP", 0)
+# --- Per-game ingestion (box-score deltas applied with $inc) ---
+@app.route("/api/games", methods=["POST"])
+def ingest_game():
+    data = request.get_json(silent=True)
 
-        try:
-            mvp_point = int(mvp_point)
-        except ValueError:
-            mvp_point = 0
-
-        if name in combined:
-            combined[name]["MVPPoints"] = mvp_point
-        else: 
-            combined[name] = {
-                "Athlete": name,
-                "PitchingPoints": 0,
-                "HittingPoints": 0,  
-                "MVPPoints": mvp_point,
-                "WINPoints" : 0
-            }
-    
-    for doc in win_points.find({}):
-        name = doc.get("Athlete")
-        if not name:
-            continue
+    if not data or not isinstance(data.get("athletes"), list):
+        return jsonify({"error": "Expected JSON: { game_id: ..., athletes: [...] }"}), 400
 
-        win_point = doc.get("Total Win", 0)
+    athletes = data["athletes"]
+    athlete_ids = registry.resolve([a.get("Athlete") for a in athletes
+                                    if isinstance(a, dict) and isinstance(a.get("Athlete"), str)])
 
-        try:
-            win_point = int(win_point)
-        except ValueError:
-            win_point = 0
-
-        if name in combined:
-            combined[name]["WINPoints"] = win_point
-        else: 
-            combined[name] = {
-                "Athlete": name,
-                "PitchingPoints": 0,
-                "HittingPoints": 0,  
-                "MVPPoints": 0,
-                "WINPoints" : win_point
-            }
-
-    # Clear old combined collection and insert new totals
-    collection3.delete_many({})
-    final_docs = []
-    for data in combined.values():
-        data["TotalPoints"] = (
-            data.get("PitchingPoints", 0) +
-            data.get("HittingPoints", 0) +
-            data.get("MVPPoints", 0) +
-            data.get("WINPoints", 0)
-        )
-        collection3.insert_one(data)
-        final_docs.append(data)
+    try:
+        ops = build_game_updates(athletes, athlete_ids)
+    except DeltaError as e:
+        return jsonify({"error": str(e)}), 400
+    stamp_athlete_ids()  # the updates match documents by AthleteID
+
+    targets = {
+        "hitting": collection2,
+        "pitching": collection1,
+        "mvp": mvp_points,
+        "win": win_points,
+        "players": collection3,
+    }
+
+    # The game_id marker and every collection's writes commit together (MongoDB
+    # transactions need a replica set, as Atlas runs): a game is applied at most
+    # once, so replaying a scraped page is harmless, and a failed write leaves
+    # nothing behind for the retry to count twice.
+    game_id = data.get("game_id")
+
+    def apply_game(session):
+        if game_id is not None:
+            ingested_games.insert_one({"_id": game_id, "applied_at": datetime.datetime.utcnow()},
+                                      session=session)
+        updated = {}
+        for key, collection in targets.items():
+            if ops[key]:
+                result = collection.bulk_write(ops[key], ordered=False, session=session)
+                updated[key] = result.modified_count + result.upserted_count
+        return updated
 
-    return jsonify({"status": "Combined points updated", "count": len(final_docs)}), 200
+    try:
+        with client.start_session() as session:
+            updated = session.with_transaction(apply_game)
+    except DuplicateKeyError:
+        return jsonify({"status": "Game already applied", "game_id": game_id}), 409
+    mark_changed(*(targets[key] for key in updated))
+
+    return jsonify({
+        "status": "Game stats applied",
+        "game_id": game_id,
+        "athletes": len(athletes),
+        "updated": updated,
+    }), 200
+
+# --- Leaderboard (joined + ranked, served from the in-memory snapshot) ---
+@app.route("/api/leaderboard", methods=["GET"])
+@conditional("players", "players_hitting", "pitching_players", "MVP_points", "Win_points", "player_info",
+             source=shared_leaderboard)
+def get_leaderboard():
+    # position, min_games, category, sort, order, limit, offset (see leaderboard.py)
+    try:
+        query = parse_leaderboard_args(request.args)
+        fmt = negotiate(request.args, request.accept_mimetypes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if query is not None:
+        return leaderboard_query_response(query, get_ranked_rows(), fmt)
+    if fmt != "json":
+        ranked = get_ranked_rows()
+        if ranked is None:
+            return jsonify({"error": "No leaderboard data available"}), 404
+        body, mimetype = leaderboard_body(ranked, fmt)
+        return app.response_class(body, mimetype=mimetype)
+
+    snapshot = shared_leaderboard.body() if shared_leaderboard else None
+    if snapshot is None:
+        # development server, or the builder hasn't published yet
+        snapshot = get_leaderboard_snapshot()
+    if not snapshot:
+        return jsonify({"error": "No leaderboard data available"}), 404
+    return app.response_class(snapshot, mimetype="application/json")
+
+# --- Batch reads (several resources in one response, see reads.py) ---
+@app.route("/api/batch", methods=["GET"])
+@conditional(*(collection.name for collection, _ in read_resources.values()))
+def get_batch():
+    try:
+        names = parse_resources(request.args.get("resources"), read_resources)
+        params = {name: parse_read_args(resource_args(request.args, name)) for name in names}
+        fmt = negotiate(request.args, request.accept_mimetypes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    payload, cursors = {}, {}
+    for name in names:
+        collection, reader_options = read_resources[name]
+        reader = DocReader(collection, params[name], **reader_options)
+        payload[name] = list(reader)
+        if reader.next_cursor:
+            cursors[name] = reader.next_cursor
+
+    response = format_response(payload, fmt)
+    if cursors:
+        response.headers["X-Next-Cursor"] = batch_cursor_header(cursors)
+    return response
 
 @app.route("/api/player_info", methods=["GET"])
+@conditional("player_info")
 def get_player_info():
-    docs = list(player_info.find({}))
-    for d in docs:
-        d["_id"] = str(d["_id"])
-    return jsonify(docs)
+    return serve_resource("player_info")
 
 
 # ⭐ UPDATE/REFRESH PLAYER INFO (re-import after CSV changes)
@@ -291,15 +581,23 @@ def update_player_info():
         return jsonify({"error": "Expected JSON: { players: [...] }"}), 400
 
     players = data["players"]
+    try:
+        validate_players(players)
+    except RosterError as e:
+        return jsonify({"error": str(e)}), 400
 
-    # Remove old docs
-    player_info.delete_many({})
-
-    # Insert new updated docs
-    for p in players:
-        player_info.insert_one(p)
+    # Only the differences against the stored roster are written, in one bulk_write
+    athlete_ids = registry.resolve([p["name"] for p in players])
+    ops, changes = diff_roster(players, player_info.find({}), athlete_ids)
+    if ops:
+        player_info.bulk_write(ops, ordered=False)
+        mark_changed(player_info)  # bumps the player_info version / ETag
 
-    return jsonify({"status": "player_info updated", "count": len(players)}), 200
+    return jsonify({
+        "status": "player_info updated" if ops else "player_info unchanged",
+        "count": len(players),
+        **changes,
+    }), 200
 
 
 # ⭐ DELETE PLAYER
@@ -311,10 +609,80 @@ def delete_player(player_id):
             return jsonify({"status": "no player found"}), 404
     except:
         return jsonify({"error": "Invalid ID format"}), 400
-    
+
+    mark_changed(player_info)
     return jsonify({"status": "player deleted"}), 200
 
 
+# --- Athlete registry ---
+@app.route("/api/athletes", methods=["GET"])
+def get_athletes():
+    try:
+        fmt = negotiate(request.args, request.accept_mimetypes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    docs = list(registry.athletes.find({}).sort("_id", 1))
+    return format_response([{"AthleteID": d["_id"], "name": d["name"], "aliases": d["aliases"]} for d in docs], fmt)
+
+@app.route("/api/athletes/<int:athlete_id>/aliases", methods=["POST"])
+def add_athlete_alias(athlete_id):
+    data = request.get_json(silent=True)
+
+    if not data or not data.get("name"):
+        return jsonify({"error": "Expected JSON: { name: ... }"}), 400
+
+    try:
+        if not registry.add_alias(athlete_id, data["name"]):
+            return jsonify({"status": "no athlete found"}), 404
+    except DuplicateKeyError:
+        return jsonify({"error": "That name already belongs to another athlete"}), 409
+
+    return jsonify({"status": "alias added", "AthleteID": athlete_id}), 200
+
+# --- Admin: index usage ---
+@app.route("/api/admin/indexes", methods=["GET"])
+def get_index_stats():
+    report = {}
+    for collection, indexes in required_indexes.items():
+        try:
+            stats = list(collection.aggregate([{"$indexStats": {}}]))
+        except OperationFailure as e:
+            report[collection.name] = {"error": str(e)}
+            continue
+        existing = {s["name"] for s in stats}
+        report[collection.name] = {
+            "missing": [i.document["name"] for i in indexes if i.document["name"] not in existing],
+            "indexes": [
+                {
+                    "name": s["name"],
+                    "key": dict(s["key"]),
+                    "ops": s["accesses"]["ops"],
+                    "since": s["accesses"]["since"].isoformat(),
+                }
+                for s in stats
+            ],
+        }
+    return jsonify(report)
+
+
+# --- Probes ---
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    return jsonify({"status": "ok"}), 200
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    ok, error = mongo_readiness()
+    if not ok:
+        return jsonify({"status": "unavailable", "mongo": error}), 503
+    return jsonify({"status": "ready", "indexes": "ready" if indexes_ready.is_set() else "pending"}), 200
+
+# --- Metrics (Prometheus text format, see metrics.py) ---
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    body, content_type = metrics.exposition()
+    return app.response_class(body, content_type=content_type)
+
 @app.route("/api/login", methods=["POST"])
 def login():
     try:
@@ -0,0 +1,296 @@
+"""
+Async serving mode for the read routes.
+
+The GET routes the Next.js leaderboard fans out to (/api/pitchingstats,
+/api/hittingstats, /api/mvp, /api/win, /api/points, /api/player_info,
+/api/batch and /api/leaderboard) are served here as coroutines on pymongo's
+AsyncMongoClient, so a slow query only holds up its own request instead of a
+blocking worker. /api/batch and /api/leaderboard read their collections
+concurrently with asyncio.gather.
+
+Every other request (the write routes, /api/points?as_of=, admin) is passed
+through to the Flask app, which this module imports, so one process still
+serves the whole API:
+
+    uvicorn async_backend:application --port 5000
+    APP_MODULE=async_backend:application GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \\
+        gunicorn -c gunicorn.conf.py
+
+The async client's pool is sized with MONGO_MAX_POOL_SIZE / MONGO_MIN_POOL_SIZE.
+"""
+
+import asyncio
+import functools
+import os
+import time
+
+from asgiref.wsgi import WsgiToAsgi
+from pymongo import AsyncMongoClient
+from quart import Quart, g, jsonify, request
+
+import Flask_backend_collection as backend
+import http_cache
+import metrics
+from leaderboard import build_leaderboard_rows, parse_leaderboard_args
+from reads import (AsyncDocReader, batch_cursor_header, ndjson_line, parse_read_args,
+                   parse_resources, resource_args)
+from wire import MIMETYPES, JSONProvider, negotiate, render
+
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+
+app = Quart(__name__)
+app.json = JSONProvider(app)
+client = None
+db = None
+
+
+@app.before_serving
+async def connect():
+    global client, db
+    client = AsyncMongoClient(
+        os.getenv("DATABASE_URL"),
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=5000,
+        event_listeners=[metrics.mongo_listener],
+    )
+    # connects on first use, like the sync client (see /readyz)
+    db = client[os.getenv("MONGO_DB_NAME", "softball")]
+    print(f"✓ Async MongoDB client created (pool size {MONGO_MAX_POOL_SIZE})")
+
+
+@app.after_serving
+async def disconnect():
+    await client.close()
+
+
+@app.before_request
+async def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+async def record_request(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe_request(request.method, route, response.status_code,
+                                time.perf_counter() - start)
+    return response
+
+
+# --- Conditional GET / compression (same versions and cache as http_cache.py) ---
+
+def conditional(*names, source=None):
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(*args, **kwargs):
+            versions = source or http_cache.version_source
+            etag = http_cache.representation_etag(versions.etag(names), request)
+            last_modified = versions.last_modified(names)
+
+            if http_cache.not_modified(request, etag, last_modified):
+                response = app.response_class("", status=304)
+            else:
+                response = await app.make_response(await view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            response.vary.add("Accept")
+            return response
+        return wrapper
+    return decorator
+
+
+@app.after_request
+async def compress_response(response):
+    # NDJSON is streamed and left alone
+    if response.status_code != 200 or response.mimetype not in MIMETYPES:
+        return response
+
+    body = await response.get_data()
+    if len(body) < http_cache.MIN_COMPRESS_SIZE:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = http_cache.choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    etag, _ = response.get_etag()
+    key = (request.full_path, etag, encoding) if etag else None
+    response.set_data(http_cache.encode_body(body, encoding, key))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+# --- Read routes ---
+
+def format_response(data, fmt):
+    body, mimetype = render(data, fmt)
+    return app.response_class(body, mimetype=mimetype)
+
+
+async def serve_resource(name):
+    collection, reader_options = backend.read_resources[name]
+    return await serve_reads(collection.name, **reader_options)
+
+
+async def serve_reads(collection_name, **reader_options):
+    try:
+        params = parse_read_args(request.args, request.accept_mimetypes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    reader = AsyncDocReader(db[collection_name], params, **reader_options)
+
+    if params.ndjson:
+        async def generate():
+            async for doc in reader:
+                yield ndjson_line(doc)
+            if reader.next_cursor:
+                yield ndjson_line({"next_cursor": reader.next_cursor})
+        return generate(), 200, {"Content-Type": "application/x-ndjson"}
+
+    response = format_response([doc async for doc in reader], params.format)
+    if reader.next_cursor:
+        response.headers["X-Next-Cursor"] = reader.next_cursor
+    return response
+
+
+@app.route("/api/pitchingstats", methods=["GET"])
+@conditional("pitching_players")
+async def get_pitching_stats():
+    return await serve_resource("pitchingstats")
+
+
+@app.route("/api/hittingstats", methods=["GET"])
+@conditional("players_hitting")
+async def get_hitting_stats():
+    return await serve_resource("hittingstats")
+
+
+@app.route("/api/mvp", methods=["GET"])
+@conditional("MVP_points")
+async def get_MVP_points():
+    return await serve_resource("mvp")
+
+
+@app.route("/api/win", methods=["GET"])
+@conditional("Win_points")
+async def get_WIN_points():
+    return await serve_resource("win")
+
+
+@app.route("/api/points", methods=["GET"])
+@conditional("players")
+async def get_combined_points():
+    return await serve_resource("points")
+
+
+@app.route("/api/player_info", methods=["GET"])
+@conditional("player_info")
+async def get_player_info():
+    return await serve_resource("player_info")
+
+
+@app.route("/api/batch", methods=["GET"])
+@conditional(*(collection.name for collection, _ in backend.read_resources.values()))
+async def get_batch():
+    try:
+        names = parse_resources(request.args.get("resources"), backend.read_resources)
+        params = {name: parse_read_args(resource_args(request.args, name)) for name in names}
+        fmt = negotiate(request.args, request.accept_mimetypes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    readers = {}
+    for name in names:
+        collection, reader_options = backend.read_resources[name]
+        readers[name] = AsyncDocReader(db[collection.name], params[name], **reader_options)
+
+    async def read_all(reader):
+        return [doc async for doc in reader]
+
+    results = await asyncio.gather(*(read_all(reader) for reader in readers.values()))
+    response = format_response(dict(zip(readers, results)), fmt)
+    cursors = {name: r.next_cursor for name, r in readers.items() if r.next_cursor}
+    if cursors:
+        response.headers["X-Next-Cursor"] = batch_cursor_header(cursors)
+    return response
+
+
+LEADERBOARD_SOURCES = ("players", "players_hitting", "pitching_players", "MVP_points", "Win_points", "player_info")
+
+
+async def build_leaderboard_snapshot():
+    """Build the leaderboard with the async client: (JSON body, RankedRows), cached like the Flask route's."""
+    generation = backend.leaderboard_generation
+    points, hitting, pitching, mvp, win, info = await asyncio.gather(*(
+        db[name].find({}, {"_id": 0}).to_list(None) for name in LEADERBOARD_SOURCES
+    ))
+    rows = build_leaderboard_rows(points=points, hitting=hitting, pitching=pitching,
+                                  mvp=mvp, win=win, info=info)
+    return backend.cache_leaderboard_snapshot(rows, generation)
+
+
+async def get_ranked_rows():
+    """backend.get_ranked_rows(), but a missing snapshot is built without blocking the loop."""
+    ranked = backend.shared_leaderboard.ranked() if backend.shared_leaderboard else False
+    if ranked is False:
+        ranked = backend.leaderboard_ranked
+        if ranked is None:
+            _, ranked = await build_leaderboard_snapshot()
+    return ranked
+
+
+@app.route("/api/leaderboard", methods=["GET"])
+@conditional(*LEADERBOARD_SOURCES, source=backend.shared_leaderboard)
+async def get_leaderboard():
+    try:
+        query = parse_leaderboard_args(request.args)
+        fmt = negotiate(request.args, request.accept_mimetypes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if query is not None or fmt != "json":
+        ranked = await get_ranked_rows()
+        if ranked is None:
+            return jsonify({"error": "No leaderboard data available"}), 404
+        if query is None:
+            body, mimetype = backend.leaderboard_body(ranked, fmt)
+            return app.response_class(body, mimetype=mimetype)
+        total, rows = ranked.query(query)
+        response = format_response(rows, fmt)
+        response.headers["X-Total-Count"] = str(total)
+        return response
+
+    snapshot = backend.shared_leaderboard.body() if backend.shared_leaderboard else None
+    if snapshot is None:
+        snapshot = backend.leaderboard_snapshot
+    if snapshot is None:
+        snapshot, _ = await build_leaderboard_snapshot()
+    if not snapshot:
+        return jsonify({"error": "No leaderboard data available"}), 404
+    return app.response_class(snapshot, mimetype="application/json")
+
+
+# --- ASGI entrypoint: async reads here, everything else through Flask ---
+
+ASYNC_PATHS = {rule.rule for rule in app.url_map.iter_rules() if rule.endpoint != "static"}
+flask_app = WsgiToAsgi(backend.app)
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan" or (
+        scope["type"] == "http"
+        and scope["method"] in ("GET", "HEAD")
+        and scope["path"] in ASYNC_PATHS
+        and b"as_of=" not in scope["query_string"]  # snapshot reads stay on the Flask route
+    ):
+        await app(scope, receive, send)
+    else:
+        await flask_app(scope, receive, send)
@@ -0,0 +1,88 @@
+"""
+Canonical athlete registry.
+
+Every athlete gets a stable integer AthleteID stored in the `athletes`
+collection together with the normalized spellings (aliases) of their name
+seen so far. Stat documents carry the AthleteID, so joins across
+collections are integer lookups instead of free-text name matches
+("Binford, A." in player_info and "Binford, A" in the stat tables are the
+same athlete). The unique index on `aliases` is declared with the other
+indexes in Flask_backend_collection.py.
+"""
+
+import re
+
+from pymongo import ReturnDocument, UpdateMany
+from pymongo.errors import DuplicateKeyError
+
+
+def normalize_name(name):
+    """'  Binford ,  A. ' -> 'binford, a'"""
+    name = re.sub(r"\s+", " ", str(name or "")).strip().lower()
+    name = re.sub(r"\s*,\s*", ", ", name)
+    return name.rstrip(". ")
+
+
+class AthleteRegistry:
+    def __init__(self, db):
+        self.athletes = db["athletes"]
+        self.counters = db["counters"]
+        self._ids = {}  # alias -> AthleteID, IDs never change once assigned
+
+    def _allocate(self, count):
+        counter = self.counters.find_one_and_update(
+            {"_id": "athletes"}, {"$inc": {"seq": count}},
+            upsert=True, return_document=ReturnDocument.AFTER,
+        )
+        return range(counter["seq"] - count + 1, counter["seq"] + 1)
+
+    def resolve(self, names, create=True):
+        """Map each name to its AthleteID, registering unknown athletes."""
+        aliases = {name: normalize_name(name) for name in names if name}
+        missing = {a for a in aliases.values() if a not in self._ids}
+
+        if missing:
+            for doc in self.athletes.find({"aliases": {"$in": list(missing)}}, {"aliases": 1}):
+                for alias in doc["aliases"]:
+                    self._ids[alias] = doc["_id"]
+            missing = {a for a in missing if a not in self._ids}
+
+        if missing and create:
+            originals = {}
+            for name, alias in aliases.items():
+                originals.setdefault(alias, name)
+            for athlete_id, alias in zip(self._allocate(len(missing)), sorted(missing)):
+                try:
+                    self.athletes.insert_one(
+                        {"_id": athlete_id, "name": originals[alias], "aliases": [alias]})
+                    self._ids[alias] = athlete_id
+                except DuplicateKeyError:
+                    # registered concurrently; use theirs (this ID is just skipped)
+                    doc = self.athletes.find_one({"aliases": alias}, {"_id": 1})
+                    self._ids[alias] = doc["_id"]
+
+        return {name: self._ids[alias] for name, alias in aliases.items() if alias in self._ids}
+
+    def add_alias(self, athlete_id, name):
+        alias = normalize_name(name)
+        result = self.athletes.update_one({"_id": athlete_id}, {"$addToSet": {"aliases": alias}})
+        if result.matched_count:
+            self._ids[alias] = athlete_id
+        return result.matched_count > 0
+
+    def stamp(self, collection, name_field="Athlete"):
+        """
+        Set AthleteID on every document of `collection` that doesn't have one
+        yet; returns the number of documents changed, so the caller can bump
+        the collection's data version.
+        """
+        names = collection.distinct(name_field, {"AthleteID": {"$exists": False}})
+        ids = self.resolve([n for n in names if isinstance(n, str)])
+        if not ids:
+            return 0
+        result = collection.bulk_write([
+            UpdateMany({name_field: name, "AthleteID": {"$exists": False}},
+                       {"$set": {"AthleteID": athlete_id}})
+            for name, athlete_id in ids.items()
+        ], ordered=False)
+        return result.modified_count
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Load and recompute benchmarks for the backend.
+
+For each league size a synthetic roster (hitting, pitching, MVP, win and
+player_info documents with realistic distributions, from a fixed seed) is
+written to a scratch database, the three recompute routes are timed once
+each, and every GET route is hit repeatedly to get latency percentiles and
+throughput. Results are printed as a table and written as JSON, so a change
+can be compared against a saved baseline.
+
+The backend is driven in-process through Flask's test client (no network,
+no server to start), or over HTTP with --url; the server then has to be
+started with the same DATABASE_URL and MONGO_DB_NAME.
+
+Usage:
+    python benchmark.py --athletes 1000,10000,100000
+    python benchmark.py --in-memory --athletes 1000      # throwaway mongod, needs pymongo_inmemory
+    python benchmark.py --url http://localhost:5000 --concurrency 8
+    python benchmark.py --output after.json --baseline before.json
+    python benchmark.py --formats json,columns,msgpack     # also time the other response formats
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
+
+BENCH_DB_NAME = "softball_bench"
+INSERT_CHUNK = 10000
+
+POST_ROUTES = ["/api/pitchingstats", "/api/hittingstats", "/api/points"]
+GET_ROUTES = [
+    "/api/pitchingstats",
+    "/api/hittingstats",
+    "/api/mvp",
+    "/api/win",
+    "/api/points",
+    "/api/player_info",
+    "/api/leaderboard",
+    "/api/batch",
+]
+def format_routes(formats):
+    """GET_ROUTES once per response format (see wire.py); JSON keeps the plain path."""
+    return [path if fmt == "json" else f"{path}?format={fmt}" for fmt in formats for path in GET_ROUTES]
+
+
+# what the Next.js server's fetch() sends
+REQUEST_HEADERS = {"Accept-Encoding": "gzip, deflate, br"}
+POSITIONS = ["P", "C", "1B", "2B", "3B", "SS", "IF", "OF", "UT"]
+
+
+# --- Synthetic league ---
+
+def synthetic_league(n, rng, first_id=1):
+    """Column arrays for `n` athletes; each collection's docs are built from these."""
+    ids = np.arange(first_id, first_id + n)
+    games = rng.integers(5, 41, n)
+
+    pa = games * rng.integers(2, 5, n)
+    bb = rng.binomial(pa, 0.09)
+    hp = rng.binomial(pa, 0.015)
+    sf = rng.binomial(pa, 0.01)
+    sh = rng.binomial(pa, 0.01)
+    ab = pa - bb - hp - sf - sh
+    hits = rng.binomial(ab, 0.27)
+    hr = rng.binomial(hits, 0.08)
+    triples = rng.binomial(hits - hr, 0.02)
+    doubles = rng.binomial(hits - hr - triples, 0.2)
+    singles = hits - hr - triples - doubles
+
+    pitcher = rng.random(n) < 0.25
+    p_games = np.where(pitcher, rng.integers(1, 21, n), 0)
+    outs = p_games * rng.integers(6, 22, n)
+    er = rng.binomial(outs, 0.09)
+
+    times_won = rng.poisson([0.3, 0.3, 0.3, 0.2], (n, 4))
+    innings_won = rng.binomial(games * 7, 0.45)
+    games_won = rng.binomial(games, 0.5)
+
+    return {
+        "ids": ids, "games": games, "pa": pa, "ab": ab, "hits": hits,
+        "1B": singles, "2B": doubles, "3B": triples, "HR": hr,
+        "BB": bb, "HP": hp, "SF": sf, "SH": sh,
+        "SB": rng.binomial(singles + bb + hp, 0.15),
+        "CS": rng.binomial(singles + bb + hp, 0.04),
+        "SO": rng.binomial(ab, 0.2),
+        "R": rng.binomial(hits + bb + hp, 0.4),
+        "RBI": rng.binomial(hits + sf, 0.45),
+        "pitcher": pitcher, "p_games": p_games, "outs": outs, "er": er,
+        "p_hits": rng.binomial(outs + er, 0.25), "p_bb": rng.binomial(outs, 0.1),
+        "p_so": rng.binomial(outs, 0.3), "p_hr": rng.binomial(er, 0.2),
+        "times_won": times_won, "innings_won": innings_won, "games_won": games_won,
+        "positions": rng.integers(0, len(POSITIONS), n),
+        "rank_change": rng.integers(-5, 6, n),
+    }
+
+
+def athlete_name(athlete_id):
+    return f"Player{athlete_id:07d}, {chr(65 + athlete_id % 26)}"
+
+
+def league_docs(cols, mvp_values, win_values):
+    """Yield (collection name, doc) for every synthetic document."""
+    mvp_weights = np.array([mvp_values["mvp1"], mvp_values["mvp2"],
+                            mvp_values["mvp3"], mvp_values["defensive_mvp"]])
+    for i, athlete_id in enumerate(cols["ids"].tolist()):
+        name = athlete_name(athlete_id)
+        ab, hits = int(cols["ab"][i]), int(cols["hits"][i])
+        tb = int(cols["1B"][i] + 2 * cols["2B"][i] + 3 * cols["3B"][i] + 4 * cols["HR"][i])
+        on_base = hits + int(cols["BB"][i] + cols["HP"][i])
+        avg = round(hits / ab, 3) if ab else 0.0
+        obp = round(on_base / int(cols["pa"][i]), 3) if cols["pa"][i] else 0.0
+        slg = round(tb / ab, 3) if ab else 0.0
+
+        yield "players_hitting", {
+            "Athlete": name, "AthleteID": athlete_id,
+            "G": int(cols["games"][i]), "GS": int(cols["games"][i]), "PA": int(cols["pa"][i]),
+            "AB": ab, "R": int(cols["R"][i]), "H": hits,
+            **{c: int(cols[c][i]) for c in ("1B", "2B", "3B", "HR", "BB", "HP", "SO",
+                                             "SF", "SH", "SB", "CS", "RBI")},
+            "TB": tb, "AVG": avg, "OBP": obp, "SLG%": slg, "OPS": round(obp + slg, 3),
+        }
+
+        if cols["pitcher"][i]:
+            outs, er = int(cols["outs"][i]), int(cols["er"][i])
+            yield "pitching_players", {
+                "Athlete": name, "AthleteID": athlete_id,
+                "G": int(cols["p_games"][i]), "GS": int(cols["p_games"][i]),
+                "Outs": outs, "IP": outs // 3 + (outs % 3) / 10, "ER": er,
+                "H": int(cols["p_hits"][i]), "BB": int(cols["p_bb"][i]),
+                "SO": int(cols["p_so"][i]), "HR": int(cols["p_hr"][i]),
+                "ERA": round(er * 21 / outs, 2) if outs else 0.0,
+            }
+
+        won = cols["times_won"][i]
+        placings = (won * mvp_weights).tolist()
+        yield "MVP_points", {
+            "Athlete": name, "AthleteID": athlete_id,
+            "Total MVP": int(sum(placings)),
+            "1st": placings[0], "2nd": placings[1], "3rd": placings[2], "D MVP": placings[3],
+            "Times Won - 1": int(won[0]), "Times Won -2": int(won[1]),
+            "Times Won - 3": int(won[2]), "Times Won - D": int(won[3]),
+        }
+
+        innings, games = int(cols["innings_won"][i]), int(cols["games_won"][i])
+        inning_pts, game_pts = innings * win_values["inning"], games * win_values["game"]
+        yield "Win_points", {
+            "Athlete": name, "AthleteID": athlete_id,
+            "Total Win": inning_pts + game_pts, "Inning": inning_pts, "Game": game_pts,
+            "Innings Won": innings, "Games Won": games,
+        }
+
+        yield "player_info", {
+            "name": name, "AthleteID": athlete_id,
+            "position": POSITIONS[cols["positions"][i]],
+            "rank_change": int(cols["rank_change"][i]),
+            "picture_url": f"https://example.com/headshots/{athlete_id}.jpg",
+            "bio_url": f"https://example.com/athletes/{athlete_id}",
+        }
+
+
+def seed_database(db, n, seed, point_values):
+    """Replace the league collections of `db` with `n` synthetic athletes."""
+    from athletes import normalize_name
+    from shared_leaderboard import bump_shared_versions
+
+    seeded = ("players_hitting", "pitching_players", "MVP_points", "Win_points", "player_info",
+              "players", "athletes", "counters", "leaderboard_snapshots")
+    for name in seeded:
+        db[name].delete_many({})
+
+    rng = np.random.default_rng(seed)
+    pending = {}
+    counts = {}
+    for first in range(1, n + 1, INSERT_CHUNK):
+        cols = synthetic_league(min(INSERT_CHUNK, n - first + 1), rng, first)
+        for collection, doc in league_docs(cols, point_values["mvp"], point_values["win"]):
+            pending.setdefault(collection, []).append(doc)
+        pending["athletes"] = [
+            {"_id": int(i), "name": athlete_name(int(i)), "aliases": [normalize_name(athlete_name(int(i)))]}
+            for i in cols["ids"]
+        ]
+        for collection, docs in pending.items():
+            if docs:
+                db[collection].insert_many(docs, ordered=False)
+                counts[collection] = counts.get(collection, 0) + len(docs)
+        pending = {}
+
+    # the IDs are already assigned, so the registry continues after them
+    db["counters"].replace_one({"_id": "athletes"}, {"seq": n}, upsert=True)
+    # new ETags for everything, also on a server started with --url (its caches
+    # and 304s would otherwise keep answering for the previous size)
+    bump_shared_versions(db, seeded)
+    return counts
+
+
+# --- Clients ---
+
+class InProcessClient:
+    """Flask test client; one per thread (test clients aren't shared across threads)."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, headers=REQUEST_HEADERS)
+        return response.status_code, len(response.get_data())
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self._requests = requests
+        self._local = threading.local()
+
+    def request(self, method, path):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        response = session.request(method, self.base_url + path, headers=REQUEST_HEADERS)
+        return response.status_code, len(response.content)
+
+
+# --- Measurements ---
+
+def percentile(sorted_ms, q):
+    return round(float(np.percentile(sorted_ms, q)), 3) if sorted_ms else None
+
+
+def time_post(client, path):
+    begin = time.perf_counter()
+    status, _ = client.request("POST", path)
+    return {"status": status, "wall_ms": round((time.perf_counter() - begin) * 1000, 3)}
+
+
+def time_gets(client, path, requests, concurrency):
+    """Issue `requests` GETs from `concurrency` threads; latency percentiles and throughput."""
+    latencies = []
+    statuses = {}
+    sizes = []
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def worker():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            begin = time.perf_counter()
+            status, size = client.request("GET", path)
+            elapsed = (time.perf_counter() - begin) * 1000
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+                sizes.append(size)
+
+    # one untimed request so the first build of a cached body isn't in the percentiles
+    begin = time.perf_counter()
+    client.request("GET", path)
+    first_ms = (time.perf_counter() - begin) * 1000
+
+    begin = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - begin
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "bytes": int(np.median(sizes)) if sizes else 0,
+        "first_ms": round(first_ms, 3),
+        "mean_ms": round(float(np.mean(latencies)), 3) if latencies else None,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": round(latencies[-1], 3) if latencies else None,
+        "rps": round(requests / wall, 2) if wall else None,
+    }
+
+
+def run_size(db, client, n, args, point_values, on_seeded=None):
+    print(f"\n▶ {n} athletes")
+    begin = time.perf_counter()
+    counts = seed_database(db, n, args.seed, point_values)
+    seed_s = round(time.perf_counter() - begin, 3)
+    print(f"  seeded in {seed_s}s: {counts}")
+    if on_seeded:
+        on_seeded()
+
+    post = {}
+    for path in POST_ROUTES:
+        post[path] = time_post(client, path)
+        print(f"  POST {path:<22} {post[path]['wall_ms']:>10.1f} ms  ({post[path]['status']})")
+
+    get = {}
+    paths = format_routes(args.formats)
+    width = max(len(path) for path in paths)
+    for path in paths:
+        get[path] = time_gets(client, path, args.requests, args.concurrency)
+        r = get[path]
+        print(f"  GET  {path:<{width}} p50 {r['p50_ms']:>9.2f}  p90 {r['p90_ms']:>9.2f}  "
+              f"p99 {r['p99_ms']:>9.2f} ms  {r['rps']:>8.1f} req/s  {r['bytes']} B  {r['statuses']}")
+
+    return {"athletes": n, "seed_s": seed_s, "documents": counts, "post": post, "get": get}
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as f:
+        return {run["athletes"]: run for run in json.load(f)["runs"]}
+
+
+def compare(results, baseline, baseline_path):
+    """Print the change of every POST wall time and GET p50 against a baseline run."""
+    def change(new, old):
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"\nCompared with {baseline_path}:")
+    for run in results["runs"]:
+        old = baseline.get(run["athletes"])
+        if not old:
+            print(f"  {run['athletes']} athletes: not in baseline")
+            continue
+        for path, r in run["post"].items():
+            if path in old["post"]:
+                print(f"  {run['athletes']:>8} POST {path:<22} {change(r['wall_ms'], old['post'][path]['wall_ms'])}")
+        for path, r in run["get"].items():
+            if path in old["get"]:
+                print(f"  {run['athletes']:>8} GET  {path:<22} p50 {change(r['p50_ms'], old['get'][path]['p50_ms'])}"
+                      f"  rps {change(r['rps'], old['get'][path]['rps'])}")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the backend's GET routes and recomputes")
+    parser.add_argument("--athletes", default="1000,10000",
+                        help="comma-separated league sizes (default: 1000,10000)")
+    parser.add_argument("--requests", type=int, default=50, help="timed GETs per route")
+    parser.add_argument("--concurrency", type=int, default=1, help="client threads per route")
+    parser.add_argument("--seed", type=int, default=2025, help="random seed for the synthetic league")
+    parser.add_argument("--db-name", default=os.getenv("MONGO_DB_NAME", BENCH_DB_NAME))
+    parser.add_argument("--in-memory", action="store_true",
+                        help="start a throwaway mongod with pymongo_inmemory instead of DATABASE_URL")
+    parser.add_argument("--url", help="benchmark a running server instead of the app in-process")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--keep", action="store_true", help="don't drop the benchmark database afterwards")
+    parser.add_argument("--formats", default="json",
+                        help="comma-separated response formats to time the GET routes in (default: json)")
+    args = parser.parse_args()
+    args.formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+
+    if args.db_name == "softball":
+        parser.error("refusing to overwrite the live 'softball' database; use another --db-name")
+    sizes = [int(s) for s in args.athletes.split(",") if s.strip()]
+    # read first, --output may overwrite it
+    baseline = load_baseline(args.baseline) if args.baseline else None
+
+    mongod = None
+    if args.in_memory:
+        try:
+            from pymongo_inmemory import Mongod
+        except ImportError:
+            parser.error("--in-memory needs pymongo_inmemory (pip install pymongo_inmemory)")
+        mongod = Mongod()
+        mongod.start()
+        os.environ["DATABASE_URL"] = mongod.connection_string
+    # the backend reads these at import
+    os.environ["MONGO_DB_NAME"] = args.db_name
+
+    from pymongo import MongoClient
+
+    import scoring
+
+    mongo = MongoClient(os.getenv("DATABASE_URL"))
+    db = mongo[args.db_name]
+
+    if args.url:
+        client = HttpClient(args.url)
+        on_seeded = None
+    else:
+        import Flask_backend_collection as backend
+
+        client = InProcessClient(backend.app)
+
+        def on_seeded():
+            # the collections were replaced underneath the app
+            backend.registry._ids.clear()
+            backend.mark_changed(*(c for c, _ in backend.read_resources.values()))
+
+    results = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "mode": "http" if args.url else "in-process",
+            "mongo": "in-memory" if args.in_memory else "DATABASE_URL",
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "formats": args.formats,
+        },
+        "runs": [],
+    }
+    try:
+        for n in sizes:
+            results["runs"].append(run_size(db, client, n, args, scoring.point_values, on_seeded))
+    finally:
+        if not args.keep:
+            mongo.drop_database(args.db_name)
+        if mongod:
+            mongod.stop()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to {args.output}")
+
+    if baseline is not None:
+        compare(results, baseline, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Aggregation pipelines for the combined recompute (POST /api/points).
+
+The four source collections are unioned and grouped by AthleteID inside
+MongoDB. Pitching and hitting are scored from their raw stat columns with
+the same weights, coercions and rounding as scoring.py; the MVP and win
+sheets keep their own totals (Total MVP, Total Win, which /api/games
+increments too), and those are taken as stored. The categories are summed
+into TotalPoints and ranked, so no stat document is sent to Flask and no
+combined document comes back from it:
+
+    standings_pipeline   sources -> staging collection ($out)
+    publish_pipeline     staging + the baseline snapshot -> players ($out)
+
+Between the two, the backend reads only the (AthleteID, TotalPoints, Rank)
+columns of the staging collection to record the snapshot (see snapshots.py).
+$out replaces `players` atomically and keeps its indexes. Needs MongoDB 5.0+
+($setWindowFields).
+"""
+
+import scoring
+
+CATEGORIES = ("PitchingPoints", "HittingPoints", "MVPPoints", "WINPoints")
+
+
+def _number(column, to="double"):
+    # same fallback as scoring._to_float / _to_int: anything unconvertible counts as 0
+    return {"$convert": {"input": f"${column}", "to": to, "onError": 0, "onNull": 0}}
+
+
+def _points(terms, weights):
+    """Round half to even and store as an integer, like scoring._points."""
+    weighted = [{"$multiply": [float(w), term]} for w, term in zip(weights, terms)]
+    return {"$toLong": {"$round": [{"$add": weighted}, 0]}}
+
+
+def ip_outs(field="IP"):
+    """scoring.ip_to_outs on an innings-pitched field: 3.2 innings -> 11 outs."""
+    return {"$let": {
+        "vars": {"ip": _number(field)},
+        "in": {"$let": {
+            "vars": {"whole": {"$trunc": "$$ip"}},
+            "in": {"$trunc": {"$add": [
+                {"$multiply": ["$$whole", 3]},
+                {"$round": [{"$multiply": [{"$subtract": ["$$ip", "$$whole"]}, 10]}, 0]},
+            ]}},
+        }},
+    }}
+
+
+def category_points(values=None):
+    """Point expression per combined field, evaluated on its source documents."""
+    return {
+        "PitchingPoints": _points([ip_outs(), _number("ER", to="long")], scoring.pitching_weights(values)),
+        "HittingPoints": _points([_number(c) for c in scoring.HITTING_COLUMNS], scoring.hitting_weights(values)),
+        "MVPPoints": _number("Total MVP", to="long"),
+        "WINPoints": _number("Total Win", to="long"),
+    }
+
+
+def standings_pipeline(sources, output, values=None):
+    """
+    Run on the first of `sources` ([(collection name, combined field)]):
+    union, score, sum and rank every athlete into `output`.
+    """
+    points = category_points(values)
+
+    def scored(field):
+        return [
+            {"$match": {"AthleteID": {"$exists": True}}},
+            {"$project": {"_id": 0, "AthleteID": 1, "Athlete": 1, field: points[field]}},
+        ]
+
+    (_, first_field), *rest = sources
+    pipeline = scored(first_field)
+    for name, field in rest:
+        pipeline.append({"$unionWith": {"coll": name, "pipeline": scored(field)}})
+
+    pipeline += [
+        {"$group": {
+            "_id": "$AthleteID",
+            "Athlete": {"$first": "$Athlete"},  # from the first source the athlete appears in
+            **{field: {"$sum": f"${field}"} for field in CATEGORIES},
+        }},
+        {"$set": {
+            "AthleteID": "$_id",
+            "TotalPoints": {"$add": [f"${field}" for field in CATEGORIES]},
+        }},
+        {"$unset": "_id"},
+        # ties are broken by AthleteID so the ranks are reproducible
+        {"$setWindowFields": {
+            "sortBy": {"TotalPoints": -1, "AthleteID": 1},
+            "output": {"Rank": {"$documentNumber": {}}},
+        }},
+        {"$out": output},
+    ]
+    return pipeline
+
+
+def _change(previous, difference):
+    # null for athletes that weren't in the baseline snapshot
+    return {"$cond": [{"$eq": [{"$type": f"${previous}"}, "missing"]}, None, {"$subtract": difference}]}
+
+
+def publish_pipeline(snapshots, base, output):
+    """
+    Run on the staging collection: add RankChange (positive = moved up) and
+    PointsChange against snapshot `base` (None for the first one) and replace
+    `output` with the result.
+    """
+    previous = [
+        {"$match": {"_id": base}},
+        {"$project": {"_id": 0, "entry": {"$zip": {"inputs": ["$athlete_ids", "$ranks", "$total_points"]}}}},
+        {"$unwind": "$entry"},
+        {"$replaceWith": {
+            "AthleteID": {"$arrayElemAt": ["$entry", 0]},
+            "PreviousRank": {"$arrayElemAt": ["$entry", 1]},
+            "PreviousPoints": {"$arrayElemAt": ["$entry", 2]},
+        }},
+    ]
+
+    pipeline = []
+    if base is not None:
+        pipeline += [
+            {"$unionWith": {"coll": snapshots, "pipeline": previous}},
+            {"$group": {"_id": "$AthleteID", "doc": {"$mergeObjects": "$$ROOT"}}},
+            {"$replaceWith": "$doc"},
+            {"$match": {"Rank": {"$exists": True}}},  # athletes no longer in any source
+        ]
+    pipeline += [
+        {"$set": {
+            "RankChange": _change("PreviousRank", ["$PreviousRank", "$Rank"]),
+            "PointsChange": _change("PreviousPoints", ["$TotalPoints", "$PreviousPoints"]),
+        }},
+        {"$unset": ["_id", "PreviousRank", "PreviousPoints"]},
+        {"$sort": {"Rank": 1}},
+        {"$out": output},
+    ]
+    return pipeline
@@ -1,24 +1,182 @@
-#1) make a funciton that reads the CSV file
-    #- the info passed to the function is the name of the name of file, player name (row), stats (column)
-#2) use this file to read the csv files passed in 
-#3) call this function to read the data to the mongo db_sever
+#!/usr/bin/env python3
+"""
+Loads the league CSV exports in csv_files/ into MongoDB.
 
-#uploaded all data to mango 
+Each file is read in chunks, its columns are cast with a typed mapping
+(spreadsheet helper columns such as the blank ones and "Leftover?" are
+dropped) and every row is upserted by its AthleteID (see athletes.py),
+with one bulk_write per chunk. The SHA-256 of every loaded file is stored in the `csv_loads` collection, and
+files whose content hasn't changed since the last load are skipped. Every
+load bumps the collection's version in `data_versions`, so the backend's
+ETags and caches for it change without a restart.
 
+Usage:
+    python csv_reader.py                       # load every mapped file
+    python csv_reader.py "MVP_Points.csv"      # load specific files
+    python csv_reader.py --force --recompute   # reload all, then rescore via the API
+"""
 
-mvp_values = {"mvp1": 60, "mvp2": 40, "mvp3": 20, "defensive_mvp": 20}
-
+import argparse
+import datetime
+import hashlib
+import os
 
 import pandas as pd
-# this function for debugging 
+import requests
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+
+from athletes import AthleteRegistry
+from shared_leaderboard import bump_shared_versions
+
+load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
+
+CSV_DIR = os.getenv("CSV_DIR", os.path.join(os.path.dirname(__file__), "..", "csv_files"))
+CHUNK_SIZE = int(os.getenv("CSV_CHUNK_SIZE", 5000))
+CSV_ENCODING = "cp1252"  # the files are Excel exports
+
+# Columns not listed here are kept with the type pandas infers, except the
+# ones matched by drop_column()
+HITTING_TYPES = {
+    "Athlete": str,
+    "G": int, "GS": int, "PA": int, "AB": int, "R": int, "H": int,
+    "1B": int, "2B": int, "3B": int, "HR": int, "RBI": int, "BB": int,
+    "HP": int, "SO": int, "TB": int, "SF": int, "SH": int, "SB": int, "CS": int,
+    "AVG": float, "OBP": float, "SLG%": float, "OPS": float,
+}
+PITCHING_TYPES = {
+    "Athlete": str,
+    "W-L": int, "L": int, "G": int, "GS": int, "Outs": int, "H": int, "SO": int,
+    "BB": int, "ER": int, "HR": int, "HP": int, "CG": int, "SHO": int, "SV": int,
+    "B": int, "S": int, "WP": int,
+    "ERA": float, "IP": float, "B/AVG": float,
+}
+MVP_TYPES = {
+    "Athlete": str,
+    "Total MVP": int, "1st": int, "2nd": int, "3rd": int, "D MVP": int,
+    "Times Won - 1": int, "Times Won -2": int, "Times Won - 3": int, "Times Won - D": int,
+}
+WIN_TYPES = {
+    "Athlete": str,
+    "Total Win": int, "Inning": int, "Game": int, "Innings Won": int, "Games Won": int,
+}
+
+# file name -> (collection, column types)
+CSV_FILES = {
+    "AUSL Stats(Hitting).csv": ("players_hitting", HITTING_TYPES),
+    "AUSL Stats (Outs).csv": ("pitching_players", PITCHING_TYPES),
+    "MVP_Points.csv": ("MVP_points", MVP_TYPES),
+    "Win_Points.csv": ("Win_points", WIN_TYPES),
+}
+
+
+def drop_column(name):
+    # blank headers come through as "Unnamed: N"
+    return not name or name.startswith("Unnamed:") or name == "Leftover?"
+
+
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def typed_records(chunk, types):
+    chunk = chunk.rename(columns=lambda c: str(c).strip())
+    chunk = chunk[[c for c in chunk.columns if not drop_column(c)]]
+    for column, kind in types.items():
+        if column not in chunk.columns:
+            continue
+        if kind is str:
+            chunk[column] = chunk[column].fillna("").astype(str).str.strip()
+        else:
+            values = pd.to_numeric(chunk[column], errors="coerce").fillna(0)
+            chunk[column] = values.astype(kind)
+    return [r for r in chunk.to_dict(orient="records") if r.get("Athlete")]
+
+
+def load_file(db, path, collection_name, types, chunk_size=CHUNK_SIZE, force=False):
+    fname = os.path.basename(path)
+    digest = file_hash(path)
+    previous = db["csv_loads"].find_one({"_id": fname})
+    if not force and previous and previous.get("sha256") == digest:
+        print(f"⏭️  {fname} unchanged, skipping")
+        return None
+
+    collection = db[collection_name]
+    registry = AthleteRegistry(db)
+    registry.stamp(collection)  # rows are matched by AthleteID below
+    rows = upserted = modified = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_size, encoding=CSV_ENCODING):
+        records = typed_records(chunk, types)
+        if not records:
+            continue
+        ids = registry.resolve([r["Athlete"] for r in records])
+        for r in records:
+            r["AthleteID"] = ids[r["Athlete"]]
+        # another spelling of a known athlete updates their document (and its name)
+        result = collection.bulk_write(
+            [UpdateOne({"AthleteID": r["AthleteID"]}, {"$set": r}, upsert=True) for r in records],
+            ordered=False,
+        )
+        rows += len(records)
+        upserted += result.upserted_count
+        modified += result.modified_count
+
+    db["csv_loads"].replace_one(
+        {"_id": fname},
+        {"sha256": digest, "collection": collection_name, "rows": rows,
+         "loaded_at": datetime.datetime.utcnow()},
+        upsert=True,
+    )
+    bump_shared_versions(db, [collection_name])
+    print(f"✓ {fname} -> {collection_name}: {rows} rows ({upserted} new, {modified} changed)")
+    return {"rows": rows, "upserted": upserted, "modified": modified}
+
+
+def recompute(backend_url):
+    """Rescore through the API so the backend's caches see the new data."""
+    for endpoint in ("/api/hittingstats", "/api/pitchingstats", "/api/points"):
+        response = requests.post(f"{backend_url}{endpoint}")
+        response.raise_for_status()
+        print(f"✓ POST {endpoint}: {response.json()}")
+
+
 def csv_reader(file, name, stat):
-    data = pd.read_csv(file)
-    row_number = data.index[["Athlete"] == "name"][0] 
-    value = data.loc[row_number, "stat"]
-    return(value)
+    """Debug helper: read one stat of one athlete straight from a CSV."""
+    data = pd.read_csv(file, encoding=CSV_ENCODING)
+    row = data.loc[data["Athlete"] == name]
+    return row.iloc[0][stat]
+
 
+def main():
+    parser = argparse.ArgumentParser(description="Load the league CSV files into MongoDB")
+    parser.add_argument("files", nargs="*", help="CSV file names (default: every mapped file)")
+    parser.add_argument("--csv-dir", default=CSV_DIR)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--force", action="store_true", help="reload files even if unchanged")
+    parser.add_argument("--recompute", action="store_true",
+                        help="POST the recompute routes on the backend afterwards")
+    parser.add_argument("--backend-url", default=os.getenv("BACKEND_URL", "http://localhost:5000"))
+    args = parser.parse_args()
 
+    client = MongoClient(os.getenv("DATABASE_URL"))
+    db = client[os.getenv("MONGO_DB_NAME", "softball")]
 
+    changed = False
+    for fname in args.files or CSV_FILES:
+        if fname not in CSV_FILES:
+            parser.error(f"no column mapping for {fname!r}; known files: {', '.join(CSV_FILES)}")
+        collection_name, types = CSV_FILES[fname]
+        result = load_file(db, os.path.join(args.csv_dir, fname), collection_name, types,
+                           args.chunk_size, args.force)
+        changed = changed or result is not None
 
+    if args.recompute and changed:
+        recompute(args.backend_url)
 
 
+if __name__ == "__main__":
+    main()
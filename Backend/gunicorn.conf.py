@@ -0,0 +1,92 @@
+"""
+gunicorn settings for the production serving mode:
+
+    gunicorn -c gunicorn.conf.py
+
+APP_MODULE picks the app (default: the Flask app; async_backend:application
+with GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker for the async reads).
+
+Workers are forked without preloading the app, so each one opens its own
+MongoClient after the fork. The master also starts the leaderboard builder
+process that the workers serve from (see shared_leaderboard.py), and starts
+it again whenever it exits.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+wsgi_app = os.getenv("APP_MODULE", "Flask_backend_collection:app")
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 2))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+accesslog = "-"
+raw_env = ["SERVING_MODE=production"]
+
+builder = None
+BUILDER_CHECK_INTERVAL = float(os.getenv("LEADERBOARD_BUILDER_CHECK_INTERVAL", 5))  # seconds
+
+
+def on_starting(server):
+    # per-worker metric files, aggregated by /metrics (see metrics.py); must be
+    # set before the workers import prometheus_client
+    path = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR",
+                                 os.path.join(tempfile.gettempdir(), "ausl-metrics"))
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def start_builder(server):
+    global builder
+    from shared_leaderboard import run_builder
+
+    builder = multiprocessing.Process(target=run_builder, name="leaderboard-builder", daemon=True)
+    builder.start()
+    server.log.info("Started leaderboard builder (pid %s)", builder.pid)
+
+
+def builder_running():
+    if builder is None or not builder.is_alive():
+        return False
+    # the master's SIGCHLD handler reaps every child, the builder included, and
+    # is_alive() can't tell once it has: ask the kernel whether the pid still exists
+    try:
+        os.kill(builder.pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def supervise_builder(server):
+    while True:
+        time.sleep(BUILDER_CHECK_INTERVAL)
+        if not builder_running():
+            server.log.warning("Leaderboard builder (pid %s) exited, restarting it", builder.pid)
+            start_builder(server)
+
+
+def when_ready(server):
+    start_builder(server)
+    threading.Thread(target=supervise_builder, args=(server,), name="builder-supervisor", daemon=True).start()
+
+
+def on_reload(server):
+    if not builder_running():
+        start_builder(server)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    if builder is not None and builder.is_alive():
+        builder.terminate()
+        builder.join(5)
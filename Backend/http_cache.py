@@ -0,0 +1,175 @@
+"""
+Conditional GET and response compression for the read routes.
+
+Every collection has an in-process data version that the write routes bump
+(the backend combines it with the shared versions in MongoDB, see
+shared_leaderboard.DatabaseVersions).
+GET routes build a weak ETag and Last-Modified header from the versions of
+the collections they read, and answer 304 Not Modified when the client
+already has that version. Each response format (see wire.py) gets its own
+ETag. Large bodies are brotli or gzip encoded, and the
+encoded bytes are kept per (URL, ETag, encoding, digest of the body) so
+repeated 200s don't compress the same payload again; a body that changed
+under an ETag that hasn't caught up yet is encoded afresh.
+"""
+
+import datetime
+import functools
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+
+import wire
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+MIN_COMPRESS_SIZE = 1024          # bytes; smaller bodies aren't worth it
+COMPRESSED_CACHE_SIZE = 64        # number of encoded bodies kept
+
+
+class DataVersions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # a restart must not reuse ETags handed out by the previous process
+        self._epoch = format(time.time_ns(), "x")
+        self._started = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+        self._versions = {}
+        self._modified = {}
+
+    def bump(self, *names):
+        now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+                self._modified[name] = now
+
+    def version(self, name):
+        return self._versions.get(name, 0)
+
+    def etag(self, names):
+        return self._epoch + "." + ".".join(str(self.version(n)) for n in names)
+
+    def last_modified(self, names):
+        return max((self._modified.get(n, self._started) for n in names), default=self._started)
+
+
+data_versions = DataVersions()
+version_source = data_versions  # what conditional() reads ETags from
+
+
+def set_version_source(source):
+    """Read ETags/Last-Modified from `source` (anything with etag() and last_modified())."""
+    global version_source
+    version_source = source
+
+
+def representation_etag(etag, request):
+    """The JSON response keeps `etag`; other formats of the same data get their own."""
+    name = wire.requested(request)
+    return etag if name == "json" else f"{etag}.{name}"
+
+
+def not_modified(request, etag, last_modified):
+    return request.if_none_match.contains_weak(etag) or bool(
+        not request.if_none_match
+        and request.if_modified_since
+        and request.if_modified_since >= last_modified
+    )
+
+
+def conditional(*names, source=None):
+    """
+    Decorator for GET routes reading the collections `names`: sets ETag and
+    Last-Modified, and short-circuits with 304 when the client is current.
+    The versions come from `source` if given, else from version_source.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = source or version_source
+            etag = representation_etag(versions.etag(names), request)
+            last_modified = versions.last_modified(names)
+
+            if not_modified(request, etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            response.vary.add("Accept")
+            return response
+        return wrapper
+    return decorator
+
+
+# --- Compression ---
+
+_compressed = OrderedDict()
+_compressed_lock = threading.Lock()
+
+
+def choose_encoding(accepted):
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _encode(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def encode_body(body, encoding, key=None):
+    """Encode `body`, reusing the cached result for `key` (URL, ETag, encoding) and the same body."""
+    if key:
+        # blake2b hashes far faster than gzip compresses
+        key = (*key, hashlib.blake2b(body, digest_size=16).digest())
+    encoded = _compressed.get(key) if key else None
+    if encoded is None:
+        encoded = _encode(body, encoding)
+        if key:
+            with _compressed_lock:
+                _compressed[key] = encoded
+                while len(_compressed) > COMPRESSED_CACHE_SIZE:
+                    _compressed.popitem(last=False)
+    return encoded
+
+
+def compress_response(response):
+    """after_request hook: brotli/gzip encode large, non-streamed responses."""
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    etag, _ = response.get_etag()
+    key = (request.full_path, etag, encoding) if etag else None
+    response.set_data(encode_body(body, encoding, key))
+    response.headers["Content-Encoding"] = encoding
+    return response
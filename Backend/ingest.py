@@ -0,0 +1,156 @@
+"""
+Turns one game's box-score deltas into $inc updates.
+
+Each athlete entry looks like:
+
+    {
+        "Athlete": "Binford, A",
+        "hitting": {"1B": 1, "HR": 1, "AB": 3, ...},
+        "pitching": {"IP": 2.1, "ER": 1, "SO": 3, ...},
+        "mvp": ["1st", "D MVP"],
+        "win": {"Innings Won": 4, "Games Won": 1}
+    }
+
+Only counting stats can be incremented; rate stats such as AVG or ERA are
+left as they are until the next full import. Innings pitched can't be added
+with a plain $inc (3.2 + 0.2 innings is 4.1, not 3.4), so pitchers get an
+update pipeline instead: Outs is incremented and IP derived from it on the
+server, which keeps both columns in step and concurrent games from
+overwriting each other.
+"""
+
+from pymongo import UpdateOne
+
+import scoring
+from combine import ip_outs
+
+HITTING_COUNTS = set(scoring.HITTING_COLUMNS) | {"G", "GS", "PA", "AB", "R", "H", "RBI", "SO", "TB"}
+PITCHING_COUNTS = {"G", "GS", "ER", "H", "SO", "BB", "HR", "HP", "B", "S", "WP",
+                   "W-L", "L", "CG", "SHO", "SV"}
+
+# placing -> (times won column, points column, point_values["mvp"] key)
+MVP_PLACINGS = {
+    "1st": ("Times Won - 1", "1st", "mvp1"),
+    "2nd": ("Times Won -2", "2nd", "mvp2"),
+    "3rd": ("Times Won - 3", "3rd", "mvp3"),
+    "D MVP": ("Times Won - D", "D MVP", "defensive_mvp"),
+}
+
+
+class DeltaError(ValueError):
+    pass
+
+
+def _counts(name, section, allowed):
+    inc = {}
+    for key, value in (section or {}).items():
+        if key not in allowed:
+            raise DeltaError(f"{name}: '{key}' is not an incrementable stat")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise DeltaError(f"{name}: '{key}' must be a number")
+        if value:
+            inc[key] = value
+    return inc
+
+
+def _athlete_filter(name, ids):
+    # by AthleteID when the name resolved: another spelling of the same athlete
+    # must update their document, not insert a second one with the same ID
+    return dict(ids) if ids else {"Athlete": name}
+
+
+def _upsert(name, update, ids):
+    if ids:
+        update["$setOnInsert"] = {"Athlete": name}
+    return UpdateOne(_athlete_filter(name, ids), update, upsert=True)
+
+
+def _pitching_pipeline(name, inc, delta_outs):
+    """$inc `inc` and add `delta_outs` to Outs (taken from IP where missing), then set IP from Outs."""
+    added = {k: {"$add": [{"$ifNull": [f"${k}", 0]}, v]} for k, v in inc.items()}
+    added["Outs"] = {"$add": [{"$ifNull": ["$Outs", {"$toLong": ip_outs("IP")}]}, delta_outs]}
+    added["Athlete"] = {"$ifNull": ["$Athlete", {"$literal": name}]}  # a new document
+    return [
+        {"$set": added},
+        {"$set": {"IP": {"$round": [
+            {"$add": [{"$trunc": {"$divide": ["$Outs", 3]}}, {"$divide": [{"$mod": ["$Outs", 3]}, 10]}]},
+            1,
+        ]}}},
+    ]
+
+
+def build_game_updates(athletes, athlete_ids=None, values=None):
+    """
+    Build the bulk update operations for one game.
+
+    `athlete_ids` maps athlete name -> AthleteID; documents of athletes with
+    an ID are matched (and created) by it, the name is only stored on new
+    ones. The target collections must be stamped (see
+    AthleteRegistry.stamp), or an unstamped document is not found.
+
+    Returns a dict of operation lists keyed by "hitting", "pitching", "mvp",
+    "win" and "players".
+    """
+    values = values or scoring.point_values
+    athlete_ids = athlete_ids or {}
+    ops = {"hitting": [], "pitching": [], "mvp": [], "win": [], "players": []}
+
+    for entry in athletes:
+        name = entry.get("Athlete") if isinstance(entry, dict) else None
+        if not name:
+            raise DeltaError("every entry needs an 'Athlete'")
+        totals = {"HittingPoints": 0, "PitchingPoints": 0, "MVPPoints": 0, "WINPoints": 0}
+        ids = {"AthleteID": athlete_ids[name]} if name in athlete_ids else {}
+
+        hitting = _counts(name, entry.get("hitting"), HITTING_COUNTS)
+        if hitting:
+            points = int(scoring.hitting_points([hitting], values)[0])
+            totals["HittingPoints"] = points
+            ops["hitting"].append(_upsert(name, {"$inc": {**hitting, "Points": points}}, ids))
+
+        pitching_section = dict(entry.get("pitching") or {})
+        ip_delta = pitching_section.pop("IP", 0)
+        pitching = _counts(name, pitching_section, PITCHING_COUNTS)
+        if ip_delta or pitching:
+            try:
+                delta_outs = int(scoring.ip_to_outs(float(ip_delta)))
+            except (ValueError, TypeError):
+                raise DeltaError(f"{name}: 'IP' must be a number")
+            points = int(scoring.pitching_points([{"IP": ip_delta, "ER": pitching.get("ER", 0)}], values)[0])
+            totals["PitchingPoints"] = points
+            inc = {**pitching, "Points": points}
+            if delta_outs:
+                ops["pitching"].append(UpdateOne(
+                    _athlete_filter(name, ids), _pitching_pipeline(name, inc, delta_outs), upsert=True))
+            else:
+                ops["pitching"].append(_upsert(name, {"$inc": inc}, ids))
+
+        placings = entry.get("mvp") or []
+        if isinstance(placings, str):
+            placings = [placings]
+        if placings:
+            inc = {}
+            for placing in placings:
+                if placing not in MVP_PLACINGS:
+                    raise DeltaError(f"{name}: unknown MVP placing '{placing}'")
+                times_col, points_col, key = MVP_PLACINGS[placing]
+                inc[times_col] = inc.get(times_col, 0) + 1
+                inc[points_col] = inc.get(points_col, 0) + values["mvp"][key]
+            points = sum(values["mvp"][MVP_PLACINGS[p][2]] for p in placings)
+            totals["MVPPoints"] = points
+            inc["Total MVP"] = points
+            ops["mvp"].append(_upsert(name, {"$inc": inc}, ids))
+
+        win = _counts(name, entry.get("win"), set(scoring.WIN_COLUMNS))
+        if win:
+            inning = win.get("Innings Won", 0) * values["win"]["inning"]
+            game = win.get("Games Won", 0) * values["win"]["game"]
+            totals["WINPoints"] = inning + game
+            ops["win"].append(_upsert(
+                name, {"$inc": {**win, "Inning": inning, "Game": game, "Total Win": inning + game}}, ids))
+
+        total = sum(totals.values())
+        if any(totals.values()):
+            ops["players"].append(_upsert(name, {"$inc": {**totals, "TotalPoints": total}}, ids))
+
+    return ops
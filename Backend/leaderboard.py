@@ -0,0 +1,240 @@
+"""
+Builds the ranked leaderboard rows served by /api/leaderboard.
+
+This is the same join the Next.js leaderboard route used to do on every page
+load (points + hitting + pitching + MVP + win + player_info), moved next to the
+data so it can be computed once and cached. Documents are joined on their
+AthleteID (see athletes.py), falling back to the normalized name for
+documents that haven't been given one yet.
+"""
+
+from athletes import normalize_name
+
+
+def athlete_key(doc, name_field="Athlete"):
+    athlete_id = doc.get("AthleteID")
+    return athlete_id if athlete_id is not None else normalize_name(doc.get(name_field))
+
+
+def _num(value):
+    # mirrors the `value || 0` fallbacks on the frontend
+    return value if isinstance(value, (int, float)) and value else 0
+
+
+def format_rank_change(change_val):
+    """Format rank change: add "+" prefix for positive numbers."""
+    if not change_val:
+        return "–"
+    if isinstance(change_val, (int, float)):
+        return f"+{change_val}" if change_val > 0 else str(change_val)
+    if change_val in ("–", "—"):
+        return "–"
+    try:
+        num = int(str(change_val).strip())
+    except ValueError:
+        return str(change_val)
+    return f"+{num}" if num > 0 else str(change_val)
+
+
+def ip_to_outs(ip):
+    """Parse IP (innings pitched) like "3.2" into outs, one decimal digit = one out."""
+    if not ip:
+        return 0
+    innings, _, fractional = str(ip).partition(".")
+    try:
+        inning_num = int(innings)
+    except ValueError:
+        inning_num = 0
+    fractional_outs = int(fractional[0]) if fractional[:1].isdigit() else 0
+    return inning_num * 3 + fractional_outs
+
+
+def calculate_games(hitting, pitching):
+    h_games = _num((hitting or {}).get("G"))
+    p_games = _num((pitching or {}).get("G"))
+    return max(h_games, p_games) or 0
+
+
+def extract_stat_breakdown(hitting, pitching):
+    hitting = hitting or {}
+    pitching = pitching or {}
+    return {
+        "singles": _num(hitting.get("1B")),
+        "doubles": _num(hitting.get("2B")),
+        "triples": _num(hitting.get("3B")),
+        "homeRuns": _num(hitting.get("HR")),
+        "stolenBases": _num(hitting.get("SB")),
+        "caughtStealing": _num(hitting.get("CS")),
+        "walks": _num(hitting.get("BB")),
+        "hitByPitch": _num(hitting.get("HP")),
+        "sacrifices": _num(hitting.get("SF")) + _num(hitting.get("SH")),
+        "sacfly": _num(hitting.get("SF")),
+        "sacbunt": _num(hitting.get("SH")),
+        "outs": ip_to_outs(pitching.get("IP")),
+        "allowedRuns": _num(pitching.get("ER")),
+    }
+
+
+def build_leaderboard_rows(points, hitting, pitching, mvp, win, info):
+    """
+    Join the per-collection documents into LeaderboardRow dicts
+    (see frontend/app/types.ts), sorted by total points with rank and delta set.
+    """
+    hitting_map = {athlete_key(h): h for h in hitting}
+    pitching_map = {athlete_key(p): p for p in pitching}
+    mvp_map = {athlete_key(m): m for m in mvp}
+    win_map = {athlete_key(w): w for w in win}
+    info_map = {athlete_key(p, "name"): p for p in info}
+
+    rows = []
+    for player in points:
+        athlete = player.get("Athlete")
+        key = athlete_key(player)
+        h = hitting_map.get(key)
+        p = pitching_map.get(key)
+        m = mvp_map.get(key) or {}
+        w = win_map.get(key) or {}
+        pi = info_map.get(key) or {}
+
+        rows.append({
+            "athleteId": player.get("AthleteID"),
+            "rank": 0,
+            # computed from the snapshots on recompute; older data only has player_info's
+            "change": format_rank_change(
+                player["RankChange"] if "RankChange" in player else pi.get("rank_change")),
+            "athlete": athlete or "Unknown",
+            "headshot": pi.get("picture_url") or "",
+            "bio_url": pi.get("bio_url") or "",
+            "team": "",  # Not stored in the backend
+            "position": pi.get("position") or "IF",
+            "totalPts": _num(player.get("TotalPoints")),
+            "delta": "–",
+            "games": calculate_games(h, p),
+            "winPts": _num(player.get("WINPoints")),
+            "statPts": _num(player.get("HittingPoints")) + _num(player.get("PitchingPoints")),
+            "mvpPts": _num(player.get("MVPPoints")),
+            "_raw": {
+                "MVP1Points": _num(m.get("1st")),
+                "MVP2Points": _num(m.get("2nd")),
+                "MVP3Points": _num(m.get("3rd")),
+                "MVPDefensePoints": _num(m.get("D MVP")),
+                "InningsWon": _num(w.get("Innings Won")),
+                "Wins": _num(w.get("Games Won")),
+                **extract_stat_breakdown(h, p),
+            },
+        })
+
+    # Sort by total points descending (stable, like Array.prototype.sort)
+    rows.sort(key=lambda r: r["totalPts"], reverse=True)
+
+    # Assign ranks and points-to-next-rank deltas
+    for index, row in enumerate(rows):
+        row["rank"] = index + 1
+        delta = rows[index - 1]["totalPts"] - row["totalPts"] if index > 0 else 0
+        row["delta"] = f"+{delta}" if delta > 0 else "–"
+
+    return rows
+
+
+def load_leaderboard_rows(db):
+    """build_leaderboard_rows() over the league collections of `db`."""
+    fields = {"_id": 0}
+    return build_leaderboard_rows(
+        points=db["players"].find({}, fields),
+        hitting=db["players_hitting"].find({}, fields),
+        pitching=db["pitching_players"].find({}, fields),
+        mvp=db["MVP_points"].find({}, fields),
+        win=db["Win_points"].find({}, fields),
+        info=db["player_info"].find({}, fields),
+    )
+
+
+# --- Filtered / sorted queries over a built leaderboard ---
+
+# ?category= -> points column
+CATEGORIES = {"total": "totalPts", "stat": "statPts", "mvp": "mvpPts", "win": "winPts"}
+SORT_KEYS = ("rank", "athlete", "games", "totalPts", "statPts", "mvpPts", "winPts")
+QUERY_ARGS = ("position", "min_games", "category", "sort", "order", "limit", "offset")
+
+
+def _int_arg(args, name, minimum):
+    value = args.get(name)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return value
+
+
+def parse_leaderboard_args(args):
+    """
+    /api/leaderboard query parameters; raises ValueError with a client-facing message.
+
+        position=P,SS     only these positions
+        min_games=5       at least this many games
+        category=mvp      only athletes with points in that category (total, stat, mvp, win),
+                          sorted by them unless sort= is given
+        sort=games        rank, athlete, games, totalPts, statPts, mvpPts or winPts
+        order=asc         default: desc for points and games, asc for rank and athlete
+        limit=25          top-N
+        offset=25
+    """
+    if not any(name in args for name in QUERY_ARGS):
+        return None
+
+    category = args.get("category")
+    if category is not None and category not in CATEGORIES:
+        raise ValueError(f"category must be one of: {', '.join(CATEGORIES)}")
+    sort = args.get("sort") or (CATEGORIES[category] if category else "rank")
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+    order = args.get("order") or ("asc" if sort in ("rank", "athlete") else "desc")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be asc or desc")
+
+    positions = args.get("position")
+    return {
+        "positions": {p.strip().upper() for p in positions.split(",") if p.strip()} if positions else None,
+        "min_games": _int_arg(args, "min_games", 0),
+        "category": CATEGORIES.get(category) if category != "total" else None,
+        "sort": sort,
+        "descending": order == "desc",
+        "limit": _int_arg(args, "limit", 1),
+        "offset": _int_arg(args, "offset", 0) or 0,
+    }
+
+
+class RankedRows:
+    """Built leaderboard rows with their sort orders cached, for one snapshot."""
+
+    def __init__(self, rows):
+        self.rows = rows  # in rank order
+        self._orders = {}
+
+    def ordered(self, sort, descending):
+        key = (sort, descending)
+        if key not in self._orders:
+            if sort == "rank":
+                rows = self.rows[::-1] if descending else self.rows
+            else:
+                # sorted() is stable (also with reverse=True), so ties stay in rank order
+                value = (lambda r: r["athlete"].lower()) if sort == "athlete" else (lambda r: r[sort])
+                rows = sorted(self.rows, key=value, reverse=descending)
+            self._orders[key] = rows
+        return self._orders[key]
+
+    def query(self, query):
+        """(number of matching rows, requested page)."""
+        rows = self.ordered(query["sort"], query["descending"])
+        if query["positions"] is not None:
+            rows = [r for r in rows if r["position"].upper() in query["positions"]]
+        if query["min_games"]:
+            rows = [r for r in rows if r["games"] >= query["min_games"]]
+        if query["category"]:
+            rows = [r for r in rows if r[query["category"]] > 0]
+        end = query["offset"] + query["limit"] if query["limit"] else None
+        return len(rows), rows[query["offset"]:end]
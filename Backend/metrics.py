@@ -0,0 +1,131 @@
+"""
+Prometheus metrics for the backend, served on /metrics.
+
+    ausl_http_request_duration_seconds   per route, method and status
+    ausl_mongo_command_duration_seconds  per Mongo command and collection, from a
+                                         PyMongo CommandListener
+    ausl_mongo_documents_total           documents returned (reads) or written
+    ausl_mongo_command_failures_total
+    ausl_phase_duration_seconds          named phases of the hot paths (recomputes,
+                                         leaderboard build/encode, read scoring)
+
+Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+(set up in gunicorn.conf.py) and /metrics aggregates all of them.
+"""
+
+import contextlib
+import os
+import re
+import threading
+import time
+
+from flask import g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter,
+                               Histogram, generate_latest, multiprocess)
+from pymongo import monitoring
+
+# the combine recompute stages into "<name>_staging_<ObjectId>"; one label value for all of them
+STAGING_SUFFIX = re.compile(r"_staging_[0-9a-f]{24}$")
+
+LATENCY_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = Histogram(
+    "ausl_http_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+MONGO_LATENCY = Histogram(
+    "ausl_mongo_command_duration_seconds", "MongoDB command latency",
+    ["command", "collection"], buckets=LATENCY_BUCKETS)
+MONGO_DOCUMENTS = Counter(
+    "ausl_mongo_documents", "Documents returned by reads or affected by writes",
+    ["command", "collection"])
+MONGO_FAILURES = Counter(
+    "ausl_mongo_command_failures", "Failed MongoDB commands", ["command", "collection"])
+PHASE_LATENCY = Histogram(
+    "ausl_phase_duration_seconds", "Time spent in a phase of a hot path",
+    ["operation", "phase"], buckets=LATENCY_BUCKETS)
+
+
+@contextlib.contextmanager
+def timed(operation, phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_LATENCY.labels(operation, phase).observe(time.perf_counter() - start)
+
+
+def observe_request(method, route, status, seconds):
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(seconds)
+
+
+# --- Flask hooks (registered in Flask_backend_collection.py) ---
+
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+def record_request(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        observe_request(request.method, route, response.status_code, time.perf_counter() - start)
+    return response
+
+
+def exposition():
+    """(body, content type) for /metrics."""
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# --- MongoDB ---
+
+def _document_count(reply):
+    cursor = reply.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command; the collection is taken from the started event."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections = {}  # request_id -> collection name
+
+    def started(self, event):
+        command = event.command
+        if event.command_name == "getMore":
+            collection = command.get("collection")
+        else:
+            collection = command.get(event.command_name)
+        if isinstance(collection, str):
+            collection = STAGING_SUFFIX.sub("_staging", collection)
+        else:
+            collection = ""  # admin commands (ping, buildInfo, ...)
+        with self._lock:
+            self._collections[event.request_id] = collection
+
+    def _collection(self, event):
+        with self._lock:
+            return self._collections.pop(event.request_id, "")
+
+    def succeeded(self, event):
+        collection = self._collection(event)
+        MONGO_LATENCY.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+        count = _document_count(event.reply)
+        if count:
+            MONGO_DOCUMENTS.labels(event.command_name, collection).inc(count)
+
+    def failed(self, event):
+        collection = self._collection(event)
+        MONGO_LATENCY.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+        MONGO_FAILURES.labels(event.command_name, collection).inc()
+
+
+mongo_listener = MongoCommandMetrics()
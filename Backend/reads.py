@@ -0,0 +1,197 @@
+"""
+Projected, paginated and streaming reads for the GET routes.
+
+Query parameters understood by every stat route:
+
+    fields=Athlete,HR,Points   only return these fields
+    limit=100                  page size (pages are ordered by _id)
+    cursor=<id>                continue after the page that returned this cursor
+    format=ndjson              stream one JSON document per line
+    format=columns|msgpack|... other response formats (see wire.py)
+
+JSON pages put the cursor for the next page in the X-Next-Cursor header.
+NDJSON can't add headers once the body has started, so a truncated NDJSON
+page ends with a {"next_cursor": ...} line instead.
+
+/api/batch?resources=points,mvp reads several resources into one keyed JSON
+payload. The options above apply to every resource, and can be given for
+one resource only as `<resource>.<option>` (e.g. hittingstats.fields=Athlete,HR).
+Its X-Next-Cursor header lists `<resource>=<cursor>` pairs.
+"""
+
+import itertools
+import os
+
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+from flask import current_app
+
+import metrics
+import wire
+
+READ_BATCH_SIZE = int(os.getenv("READ_BATCH_SIZE", 500))
+
+
+class ReadParams:
+    def __init__(self, fields=None, limit=None, cursor=None, ndjson=False, format="json"):
+        self.fields = fields
+        self.limit = limit
+        self.cursor = cursor
+        self.ndjson = ndjson
+        self.format = format
+
+
+def parse_read_args(args, accept_mimetypes=None):
+    """Parse the query string; raises ValueError with a client-facing message."""
+    fields = args.get("fields")
+    fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+    limit = args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if limit < 1:
+            raise ValueError("limit must be positive")
+
+    cursor = args.get("cursor")
+    if cursor:
+        try:
+            cursor = ObjectId(cursor)
+        except (InvalidId, TypeError):
+            raise ValueError("Invalid cursor")
+
+    ndjson = args.get("format") == "ndjson" or bool(
+        accept_mimetypes and accept_mimetypes.best == "application/x-ndjson"
+    )
+    return ReadParams(fields, limit, cursor or None, ndjson, wire.negotiate(args, accept_mimetypes))
+
+
+def parse_resources(value, known):
+    """The resources=a,b list of /api/batch (all of `known` if not given)."""
+    if not value:
+        return list(known)
+    names = [n.strip() for n in value.split(",") if n.strip()]
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        raise ValueError(f"Unknown resources: {', '.join(unknown)} (known: {', '.join(known)})")
+    return list(dict.fromkeys(names))
+
+
+def resource_args(args, resource):
+    """Query options for one resource of /api/batch, `<resource>.<option>` overriding `<option>`."""
+    prefix = resource + "."
+    merged = {k: v for k, v in args.items() if "." not in k and k not in ("resources", "format")}
+    merged.update({k[len(prefix):]: v for k, v in args.items() if k.startswith(prefix)})
+    return merged
+
+
+def batch_cursor_header(cursors):
+    return ",".join(f"{name}={cursor}" for name, cursor in cursors.items())
+
+
+class DocReader:
+    """
+    Iterates the documents of `collection` for one request, `batch` documents
+    at a time. If `score` is given the scored "Points" field is filled in per
+    batch from `score_fields`. `last_id` is the _id of the last yielded doc.
+    """
+
+    def __init__(self, collection, params, score=None, score_fields=(), keep_id=False):
+        self.collection = collection
+        self.params = params
+        self.score = score if params.fields is None or "Points" in params.fields else None
+        self.score_fields = list(score_fields)
+        self.keep_id = keep_id
+        self.last_id = None
+        self.count = 0
+
+    def _projection(self):
+        if self.params.fields is None:
+            return None
+        projection = {field: 1 for field in self.params.fields}
+        if self.score:
+            projection.update({field: 1 for field in self.score_fields})
+        return projection
+
+    def _shape(self, doc):
+        if self.keep_id:
+            doc["_id"] = str(doc["_id"])
+        else:
+            doc.pop("_id", None)
+        if self.params.fields is not None and self.score:
+            for field in self.score_fields:
+                if field not in self.params.fields:
+                    doc.pop(field, None)
+        return doc
+
+    def _cursor(self):
+        query = {"_id": {"$gt": self.params.cursor}} if self.params.cursor else {}
+        cursor = self.collection.find(query, self._projection(), batch_size=READ_BATCH_SIZE)
+        if self.params.limit or self.params.cursor:
+            cursor = cursor.sort("_id", 1)
+        if self.params.limit:
+            cursor = cursor.limit(self.params.limit)
+        return cursor
+
+    def _finish(self, batch):
+        if self.score:
+            with metrics.timed(f"read_{self.collection.name}", "score"):
+                all_points = self.score(batch).tolist()
+            for doc, points in zip(batch, all_points):
+                doc["Points"] = points
+        for doc in batch:
+            self.last_id = doc["_id"]
+            self.count += 1
+            yield self._shape(doc)
+
+    def __iter__(self):
+        cursor = self._cursor()
+        while True:
+            batch = list(itertools.islice(cursor, READ_BATCH_SIZE))
+            if not batch:
+                return
+            yield from self._finish(batch)
+
+    @property
+    def next_cursor(self):
+        if self.params.limit and self.count == self.params.limit and self.last_id is not None:
+            return str(self.last_id)
+        return None
+
+
+class AsyncDocReader(DocReader):
+    """DocReader over a pymongo AsyncCollection, iterated with `async for`."""
+
+    async def __aiter__(self):
+        cursor = self._cursor()
+        while True:
+            batch = await cursor.to_list(READ_BATCH_SIZE)
+            if not batch:
+                return
+            for doc in self._finish(batch):
+                yield doc
+
+
+def ndjson_line(doc):
+    return wire.dumps(doc) + b"\n"
+
+
+def read_response(reader):
+    """Build the buffered (JSON, MessagePack, ...) or NDJSON (streamed) response for a DocReader."""
+    if reader.params.ndjson:
+        def generate():
+            for doc in reader:
+                yield ndjson_line(doc)
+            if reader.next_cursor:
+                yield ndjson_line({"next_cursor": reader.next_cursor})
+        return current_app.response_class(generate(), mimetype="application/x-ndjson")
+
+    docs = list(reader)
+    with metrics.timed(f"read_{reader.collection.name}", "encode"):
+        body, mimetype = wire.render(docs, reader.params.format)
+    response = current_app.response_class(body, mimetype=mimetype)
+    if reader.next_cursor:
+        response.headers["X-Next-Cursor"] = reader.next_cursor
+    return response
@@ -0,0 +1,65 @@
+"""
+Diff-based refresh of player_info.
+
+POST /api/player_info sends the whole roster. Instead of deleting every
+document and inserting the list again, the incoming players are matched to
+the stored documents by name and only the differences become write
+operations: new names are inserted, changed documents replaced (a refresh
+replaces the whole document, as before), and names no longer sent deleted.
+"""
+
+from pymongo import DeleteMany, InsertOne, ReplaceOne
+
+
+class RosterError(ValueError):
+    pass
+
+
+def validate_players(players):
+    if not isinstance(players, list):
+        raise RosterError("players must be a list")
+    seen = set()
+    for index, player in enumerate(players):
+        if not isinstance(player, dict) or not isinstance(player.get("name"), str) or not player["name"].strip():
+            raise RosterError(f"players[{index}] needs a non-empty string name")
+        if player["name"] in seen:
+            raise RosterError(f"players[{index}]: duplicate name {player['name']!r}")
+        seen.add(player["name"])
+
+
+def diff_roster(players, stored, athlete_ids):
+    """
+    Write operations turning the `stored` player_info documents into `players`,
+    and the counts of inserted/updated/deleted/unchanged documents.
+    `athlete_ids` maps names to AthleteIDs; the documents are stored with them.
+    """
+    current = {}
+    extra_ids = []  # stored duplicates of a name (older data), dropped
+    for doc in stored:
+        if doc.get("name") in current:
+            extra_ids.append(doc["_id"])
+        else:
+            current[doc.get("name")] = doc
+
+    ops = []
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    for player in players:
+        desired = {k: v for k, v in player.items() if k != "_id"}
+        if athlete_ids.get(player["name"]) is not None:
+            desired.setdefault("AthleteID", athlete_ids[player["name"]])
+
+        doc = current.pop(player["name"], None)
+        if doc is None:
+            ops.append(InsertOne(desired))
+            counts["inserted"] += 1
+        elif {k: v for k, v in doc.items() if k != "_id"} == desired:
+            counts["unchanged"] += 1
+        else:
+            ops.append(ReplaceOne({"_id": doc["_id"]}, desired))
+            counts["updated"] += 1
+
+    removed = [doc["_id"] for doc in current.values()] + extra_ids
+    if removed:
+        ops.append(DeleteMany({"_id": {"$in": removed}}))
+        counts["deleted"] = len(removed)
+    return ops, counts
@@ -0,0 +1,139 @@
+"""
+Vectorized scoring for the whole roster.
+
+The stat columns of every document are loaded into one NumPy matrix and
+multiplied by a weight vector, so a full rescore is a single matrix product
+instead of a Python loop per athlete. Point values come from
+point_values.json (or the file named by POINT_VALUES_PATH).
+"""
+
+import json
+import os
+
+import numpy as np
+
+POINT_VALUES_PATH = os.getenv(
+    "POINT_VALUES_PATH", os.path.join(os.path.dirname(__file__), "point_values.json")
+)
+
+# Stat columns in the order their weights are laid out
+HITTING_COLUMNS = ["1B", "2B", "3B", "HR", "SB", "CS", "BB", "HP", "SF", "SH"]
+PITCHING_COLUMNS = ["IP", "ER"]
+MVP_COLUMNS = ["Times Won - 1", "Times Won -2", "Times Won - 3", "Times Won - D"]
+WIN_COLUMNS = ["Innings Won", "Games Won"]
+
+
+def load_point_values(path=POINT_VALUES_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+point_values = load_point_values()
+
+
+# --- Weight vectors (one entry per column above) ---
+
+def hitting_weights(values=None):
+    v = (values or point_values)["hitting"]
+    return np.array([
+        v["Single"], v["Double"], v["Triple"], v["Home Run"],
+        v["Stolen Base"], v["Caught Stealing"], v["Walk"], v["HBP"],
+        v["Sacrifice Fly/Bunt"], v["Sacrifice Fly/Bunt"],
+    ], dtype=np.float64)
+
+
+def pitching_weights(values=None):
+    v = (values or point_values)["pitching"]
+    # applied to [outs, ER], not [IP, ER]
+    return np.array([v["out"], v["allowed run"]], dtype=np.float64)
+
+
+def mvp_weights(values=None):
+    v = (values or point_values)["mvp"]
+    return np.array([v["mvp1"], v["mvp2"], v["mvp3"], v["defensive_mvp"]], dtype=np.float64)
+
+
+def win_weights(values=None):
+    v = (values or point_values)["win"]
+    return np.array([v["inning"], v["game"]], dtype=np.float64)
+
+
+# --- Loading stat columns ---
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _to_int(value):
+    # same coercion as int(doc.get("ER", 0)) with a fallback of 0
+    try:
+        return float(int(value))
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def stat_matrix(docs, columns, convert=_to_float):
+    """Load `columns` of every doc into an (n_docs, n_columns) float matrix."""
+    docs = docs if isinstance(docs, list) else list(docs)
+    if not docs:
+        return np.zeros((0, len(columns)), dtype=np.float64)
+    return np.array(
+        [[convert(doc.get(col, 0)) for col in columns] for doc in docs],
+        dtype=np.float64,
+    )
+
+
+def ip_to_outs(ip):
+    """Innings pitched (3.2 = 3 innings + 2 outs) to outs, element-wise."""
+    whole = np.trunc(ip)
+    return whole * 3 + np.rint((ip - whole) * 10)
+
+
+def outs_to_ip(outs):
+    """Inverse of ip_to_outs: 11 outs -> 3.2 innings."""
+    outs = np.asarray(outs)
+    return np.floor_divide(outs, 3) + np.remainder(outs, 3) / 10
+
+
+def pitching_matrix(docs):
+    """[outs, ER] per doc, ready to be multiplied by pitching_weights()."""
+    docs = docs if isinstance(docs, list) else list(docs)
+    ip = stat_matrix(docs, ["IP"])[:, 0]
+    er = stat_matrix(docs, ["ER"], convert=_to_int)[:, 0]
+    outs = np.trunc(ip_to_outs(ip))
+    return np.column_stack([outs, er])
+
+
+def _points(matrix, weights):
+    return np.rint(matrix @ weights).astype(np.int64)
+
+
+# --- Scoring ---
+
+def hitting_points(docs, values=None):
+    return _points(stat_matrix(docs, HITTING_COLUMNS), hitting_weights(values))
+
+
+def pitching_points(docs, values=None):
+    return _points(pitching_matrix(docs), pitching_weights(values))
+
+
+def mvp_points(docs, values=None):
+    return _points(stat_matrix(docs, MVP_COLUMNS), mvp_weights(values))
+
+
+def win_points(docs, values=None):
+    return _points(stat_matrix(docs, WIN_COLUMNS), win_weights(values))
+
+
+def score_roster(hitting=(), pitching=(), mvp=(), win=(), values=None):
+    """Score every category for the whole roster; returns one array per category."""
+    return {
+        "hitting": hitting_points(hitting, values),
+        "pitching": pitching_points(pitching, values),
+        "mvp": mvp_points(mvp, values),
+        "win": win_points(win, values),
+    }
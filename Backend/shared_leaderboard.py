@@ -0,0 +1,243 @@
+"""
+Shared leaderboard for the multi-worker (gunicorn) serving mode.
+
+The write routes $inc per-collection versions in the `data_versions`
+collection. One builder process, started by the gunicorn master (see
+gunicorn.conf.py), polls those versions and, when they change, rebuilds the
+leaderboard and publishes it together with the versions it was built from to
+a file under /dev/shm, swapped in with os.replace. Workers mmap that file
+read-only: none of them runs the join, and all of them serve the same
+leaderboard body under the same ETag. The builder touches the file on every
+poll; if it stops doing so for LEADERBOARD_STALE_AFTER seconds (the builder
+died or hangs), workers ignore the file and fall back to building and
+versioning on their own until it is published again.
+
+Every other GET route takes its ETags from DatabaseVersions: the versions
+collection itself, plus the process's own writes, so a write shows up in
+the worker that made it at once, and in the others and for writes made
+elsewhere (csv_reader.py) within a poll interval.
+
+File layout: MAGIC, header length (uint32), JSON header, leaderboard JSON body.
+"""
+
+import datetime
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from leaderboard import RankedRows, load_leaderboard_rows
+from wire import dumps, loads
+
+load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
+
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SHARED_PATH = os.getenv("LEADERBOARD_SHM_PATH", os.path.join(SHM_DIR, "ausl_leaderboard"))
+BUILDER_POLL_INTERVAL = float(os.getenv("LEADERBOARD_BUILDER_INTERVAL", 0.5))  # seconds
+STALE_AFTER = float(os.getenv("LEADERBOARD_STALE_AFTER", 30))  # seconds without a builder heartbeat
+
+MAGIC = b"AUSL1"
+HEADER = struct.Struct("<5sI")
+VERSIONS_ID = "versions"
+
+
+def bump_shared_versions(db, names):
+    """Called with every write: the builder rebuilds when these change."""
+    if not names:
+        return
+    now = int(time.time())
+    db["data_versions"].update_one(
+        {"_id": VERSIONS_ID},
+        {"$inc": {f"versions.{n}": 1 for n in names},
+         "$max": {f"modified.{n}": now for n in names}},
+        upsert=True,
+    )
+
+
+class DatabaseVersions:
+    """
+    ETag version source of the GET routes: the shared versions in
+    `data_versions` combined with the in-process `local` ones, so a write
+    shows up in this process at once and a write from another process within
+    `ttl`. A background thread re-reads the shared versions every `ttl`
+    seconds; requests only read the last copy, so a slow or unreachable Mongo
+    never blocks them (nor the async backend's event loop).
+    """
+
+    def __init__(self, db, local, ttl=BUILDER_POLL_INTERVAL):
+        self.db = db
+        self.local = local
+        self.ttl = ttl
+        self._state = {}  # the last versions document read
+        self._lock = threading.Lock()
+        self._refresher = None  # (pid, thread); a forked worker starts its own
+
+    def _refresh(self):
+        while True:
+            try:
+                self._state = self.db["data_versions"].find_one({"_id": VERSIONS_ID}) or {}
+            except Exception as e:
+                print(f"⚠ Could not read shared data versions: {e}")
+            time.sleep(self.ttl)
+
+    def _shared(self):
+        refresher = self._refresher
+        if refresher is None or refresher[0] != os.getpid():
+            with self._lock:
+                if self._refresher is None or self._refresher[0] != os.getpid():
+                    thread = threading.Thread(target=self._refresh, name="data-versions", daemon=True)
+                    thread.start()
+                    self._refresher = (os.getpid(), thread)
+        return self._state
+
+    def etag(self, names):
+        shared = self._shared().get("versions", {})
+        return self.local.etag(names) + "-" + ".".join(str(shared.get(n, 0)) for n in names)
+
+    def last_modified(self, names):
+        local = self.local.last_modified(names)
+        shared = self._shared().get("modified", {})
+        modified = [shared.get(n) for n in names]
+        seconds = max((m for m in modified if m is not None), default=None)
+        if seconds is None:
+            return local
+        return max(local, datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc))
+
+
+# --- Builder ---
+
+def publish(path, meta, body):
+    header = json.dumps(meta).encode("utf-8")
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".leaderboard-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(header)))
+            f.write(header)
+            f.write(body)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)  # readers see either the old file or the new one
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def run_builder(path=SHARED_PATH, interval=BUILDER_POLL_INTERVAL):
+    client = MongoClient(os.getenv("DATABASE_URL"), serverSelectionTimeoutMS=5000)
+    db = client[os.getenv("MONGO_DB_NAME", "softball")]
+    # a fresh builder (e.g. after the database was reset) must not reuse old ETags
+    epoch = format(time.time_ns(), "x")
+    started = int(time.time())
+    published = None
+    print(f"✓ Leaderboard builder publishing to {path}")
+
+    while True:
+        try:
+            state = db["data_versions"].find_one({"_id": VERSIONS_ID}) or {}
+            versions = state.get("versions", {})
+            if versions != published:
+                begin = time.perf_counter()
+                rows = load_leaderboard_rows(db)
+                meta = {
+                    "epoch": epoch,
+                    "started": started,
+                    "versions": versions,
+                    "modified": state.get("modified", {}),
+                }
+                publish(path, meta, dumps(rows) if rows else b"")
+                published = versions
+                print(f"✓ Leaderboard published: {len(rows)} rows in "
+                      f"{(time.perf_counter() - begin) * 1000:.0f} ms")
+            else:
+                os.utime(path)  # heartbeat: the published file is still current
+        except Exception as e:
+            print(f"⚠ Leaderboard build failed: {e}")
+        time.sleep(interval)
+
+
+# --- Workers ---
+
+class SharedLeaderboard:
+    """
+    Read side of the shared file, used by each worker. Also the ETag version
+    source of /api/leaderboard, which serves the file (the other routes'
+    versions would run ahead of it), falling back to `fallback` until the
+    builder has published, and while the file is stale.
+    """
+
+    def __init__(self, fallback, path=SHARED_PATH, stale_after=STALE_AFTER):
+        self.path = path
+        self.fallback = fallback
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self._current = None  # (file identity, meta, mmap, body offset)
+        self._ranked = (None, None)  # (file identity, RankedRows)
+
+    def _snapshot(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        if time.time() - st.st_mtime > self.stale_after:
+            return None  # no heartbeat from the builder
+        # every publish is a new file (os.replace); the heartbeat only changes the mtime
+        current = self._current
+        if current and current[0] == st.st_ino:
+            return current
+
+        with self._lock:
+            with open(self.path, "rb") as f:
+                st = os.fstat(f.fileno())
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, length = HEADER.unpack_from(mapped)
+            if magic != MAGIC:
+                mapped.close()
+                raise ValueError(f"{self.path} is not a published leaderboard")
+            meta = json.loads(mapped[HEADER.size:HEADER.size + length])
+            # the previous map is left to the GC: a request may still be reading it
+            self._current = (st.st_ino, meta, mapped, HEADER.size + length)
+            return self._current
+
+    def body(self):
+        """The published leaderboard JSON, b"" if it is empty, None before the first build."""
+        current = self._snapshot()
+        if current is None:
+            return None
+        _, _, mapped, offset = current
+        return mapped[offset:]
+
+    def ranked(self):
+        """
+        The published rows as RankedRows (parsed once per published file),
+        None if the leaderboard is empty, False before the first build.
+        """
+        current = self._snapshot()
+        if current is None:
+            return False
+        identity, _, mapped, offset = current
+        cached_identity, ranked = self._ranked
+        if cached_identity != identity:
+            rows = loads(mapped[offset:]) if len(mapped) > offset else []
+            ranked = RankedRows(rows) if rows else None
+            self._ranked = (identity, ranked)
+        return ranked
+
+    def etag(self, names):
+        current = self._snapshot()
+        if current is None:
+            return self.fallback.etag(names)
+        meta = current[1]
+        return meta["epoch"] + "." + ".".join(str(meta["versions"].get(n, 0)) for n in names)
+
+    def last_modified(self, names):
+        current = self._snapshot()
+        if current is None:
+            return self.fallback.last_modified(names)
+        meta = current[1]
+        seconds = max((meta["modified"].get(n, meta["started"]) for n in names), default=meta["started"])
+        return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
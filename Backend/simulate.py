@@ -0,0 +1,187 @@
+"""
+What-if scoring: the standings under alternative point rules.
+
+POST /api/points/simulate takes many scenarios at once, each overriding some
+point values of point_values.json:
+
+    {"scenarios": [
+        {"name": "HR 50", "hitting": {"Home Run": 50}},
+        {"name": "cheaper outs", "pitching": {"out": 3}, "win": {"game": 80}}
+     ],
+     "limit": 25}
+
+The stat columns of the whole roster are loaded once per category (and kept
+until the data changes), the weight vectors of all scenarios are stacked
+into one matrix per category, and every scenario is scored with a single
+matrix product: (athletes x stat columns) @ (stat columns x scenarios).
+Each scenario is ranked like the combined recompute (TotalPoints
+descending, ties by AthleteID) and compared with the current rules:
+RankShift is positive when an athlete moves up. Nothing is written.
+
+The combined recompute takes the MVP and win points as stored (Total MVP,
+Total Win, see combine.py), so for those categories a scenario adds the
+difference its rules make on the raw columns to the stored total; with the
+current rules the standings are exactly the combined ones.
+"""
+
+import os
+
+import numpy as np
+
+import scoring
+
+MAX_SCENARIOS = int(os.getenv("SIMULATION_MAX_SCENARIOS", 256))
+
+# category -> (source collection, stat matrix loader, weight vector); in the
+# order the combined recompute takes athlete names from
+CATEGORIES = {
+    "pitching": ("pitching_players", scoring.pitching_matrix, scoring.pitching_weights),
+    "hitting": ("players_hitting", lambda docs: scoring.stat_matrix(docs, scoring.HITTING_COLUMNS),
+                scoring.hitting_weights),
+    "mvp": ("MVP_points", lambda docs: scoring.stat_matrix(docs, scoring.MVP_COLUMNS), scoring.mvp_weights),
+    "win": ("Win_points", lambda docs: scoring.stat_matrix(docs, scoring.WIN_COLUMNS), scoring.win_weights),
+}
+SOURCE_COLLECTIONS = [collection for collection, _, _ in CATEGORIES.values()]
+# category -> points column kept in its source documents (see combine.py)
+STORED_TOTALS = {"mvp": "Total MVP", "win": "Total Win"}
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+def parse_scenarios(scenarios, values=None):
+    """[(name, overrides, full point values)] for the request's scenarios."""
+    values = values or scoring.point_values
+    if not isinstance(scenarios, list) or not scenarios:
+        raise ScenarioError("scenarios must be a non-empty list")
+    if len(scenarios) > MAX_SCENARIOS:
+        raise ScenarioError(f"at most {MAX_SCENARIOS} scenarios per request")
+
+    parsed = []
+    for index, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict):
+            raise ScenarioError(f"scenarios[{index}] must be an object")
+        name = scenario.get("name", f"scenario {index + 1}")
+        overrides = {k: v for k, v in scenario.items() if k != "name"}
+        merged = {category: dict(values[category]) for category in values}
+        for category, changes in overrides.items():
+            if category not in CATEGORIES:
+                raise ScenarioError(f"scenarios[{index}]: unknown category '{category}' "
+                                    f"(known: {', '.join(CATEGORIES)})")
+            if not isinstance(changes, dict):
+                raise ScenarioError(f"scenarios[{index}].{category} must be an object")
+            for key, value in changes.items():
+                if key not in values[category]:
+                    raise ScenarioError(f"scenarios[{index}].{category}: unknown point value '{key}'")
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ScenarioError(f"scenarios[{index}].{category}.{key} must be a number")
+                merged[category][key] = value
+        parsed.append((name, overrides, merged))
+    return parsed
+
+
+class StatTables:
+    """The stat matrices of every category, with the row -> athlete mapping."""
+
+    def __init__(self, docs_by_category):
+        athletes = {}  # AthleteID -> name, first category first
+        for category in CATEGORIES:
+            for doc in docs_by_category.get(category, ()):
+                athletes.setdefault(doc["AthleteID"], doc.get("Athlete"))
+        # rows in AthleteID order, so a stable sort on points breaks ties by AthleteID
+        ids = sorted(athletes)
+        self.athlete_ids = np.array(ids)
+        self.names = [athletes[athlete_id] for athlete_id in ids]
+        position = {athlete_id: i for i, athlete_id in enumerate(ids)}
+
+        # category -> (athlete row per doc, stat matrix, rows are unique, stored totals or None)
+        self.matrices = {}
+        for category, (_, load, _) in CATEGORIES.items():
+            docs = docs_by_category.get(category, [])
+            rows = np.array([position[doc["AthleteID"]] for doc in docs], dtype=np.intp)
+            stored = None
+            if category in STORED_TOTALS:
+                # same coercion as combine._number(..., to="long")
+                stored = np.trunc(scoring.stat_matrix(docs, [STORED_TOTALS[category]])[:, 0]).astype(np.int64)
+            self.matrices[category] = (rows, load(docs), len(np.unique(rows)) == len(rows), stored)
+
+    @classmethod
+    def load(cls, db):
+        return cls({
+            category: list(db[collection].find({"AthleteID": {"$exists": True}}, {"_id": 0}))
+            for category, (collection, _, _) in CATEGORIES.items()
+        })
+
+
+def score(tables, all_values):
+    """
+    (athletes x scenarios) TotalPoints for every set of point values;
+    all_values[0] must be the rules the stored totals were scored with.
+    """
+    totals = np.zeros((len(tables.names), len(all_values)), dtype=np.int64)
+    for category, (rows, matrix, unique, stored) in tables.matrices.items():
+        weights = np.column_stack([CATEGORIES[category][2](values) for values in all_values])
+        points = np.rint(matrix @ weights).astype(np.int64)
+        if stored is not None:
+            points += (stored - points[:, 0])[:, None]
+        if unique:
+            totals[rows] += points
+        else:
+            np.add.at(totals, rows, points)  # an athlete with several documents in one collection
+    return totals
+
+
+def rank(totals):
+    """
+    (scenarios x athletes) rows in rank order, and the (athletes x scenarios)
+    rank of every athlete: 1 = most points, ties by AthleteID (the row order).
+    """
+    # one contiguous row per scenario; ties are broken by the row index folded into
+    # the key, which is unique and sorts faster than a stable sort on the points
+    n = totals.shape[0]
+    order = np.argsort(-totals.T * n + np.arange(n), axis=1)
+    ranks = np.empty_like(totals)
+    places = np.arange(1, totals.shape[0] + 1)
+    for s, rows in enumerate(order):
+        ranks[rows, s] = places
+    return order, ranks
+
+
+def standings(tables, totals, order, ranks, s, limit, base=None):
+    rows = []
+    for i in order[s, :limit].tolist():
+        row = {
+            "AthleteID": tables.athlete_ids[i].item(),
+            "Athlete": tables.names[i],
+            "TotalPoints": int(totals[i, s]),
+            "Rank": int(ranks[i, s]),
+        }
+        if base is not None:
+            row["RankShift"] = int(ranks[i, base] - ranks[i, s])
+            row["PointsShift"] = int(totals[i, s] - totals[i, base])
+        rows.append(row)
+    return rows
+
+
+def simulate(tables, scenarios, limit=None, values=None):
+    """
+    Score `scenarios` (from parse_scenarios) and the current rules together;
+    the current standings and each scenario's, `limit` rows each.
+    """
+    all_values = [values or scoring.point_values] + [merged for _, _, merged in scenarios]
+    totals = score(tables, all_values)
+    order, ranks = rank(totals)
+    return {
+        "athletes": len(tables.names),
+        "current": standings(tables, totals, order, ranks, 0, limit),
+        "scenarios": [
+            {
+                "name": name,
+                "changes": overrides,
+                "moved": int(np.count_nonzero(ranks[:, s] != ranks[:, 0])),
+                "standings": standings(tables, totals, order, ranks, s, limit, base=0),
+            }
+            for s, (name, overrides, _) in enumerate(scenarios, start=1)
+        ],
+    }
@@ -0,0 +1,81 @@
+"""
+Versioned leaderboard snapshots.
+
+Every combined recompute stores the standings column-wise (one array of
+AthleteIDs, one of total points, one of ranks) in `leaderboard_snapshots`.
+Rank and point changes are computed against the previous snapshot (in the
+combine pipeline, see combine.py), and
+/api/points?as_of= is answered straight from the stored snapshots.
+"""
+
+import datetime
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+
+def parse_as_of(value):
+    """A snapshot version ("12") or an ISO date/datetime ("2025-07-01T20:00")."""
+    if value.isdigit():
+        return int(value)
+    try:
+        as_of = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError("as_of must be a snapshot version or an ISO date")
+    if as_of.tzinfo is not None:
+        as_of = as_of.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    if len(value) == 10:
+        as_of += datetime.timedelta(days=1)  # a bare date means the end of that day
+    return as_of
+
+
+class SnapshotStore:
+    def __init__(self, db):
+        self.snapshots = db["leaderboard_snapshots"]
+        self.counters = db["counters"]
+
+    def record_standings(self, columns):
+        """
+        Store `columns` (athlete_ids, total_points, ranks, in rank order) as a
+        new snapshot. A recompute that doesn't change the standings isn't
+        stored again, and keeps comparing against the snapshot before it.
+        Returns (version, baseline snapshot to compare against or None).
+        """
+        recent = list(self.snapshots.find({}).sort("_id", DESCENDING).limit(2))
+        latest = recent[0] if recent else None
+        previous = recent[1] if len(recent) > 1 else None
+
+        if latest and all(latest[k] == v for k, v in columns.items()):
+            return latest["_id"], previous
+
+        version = self.counters.find_one_and_update(
+            {"_id": "leaderboard_snapshots"}, {"$inc": {"seq": 1}},
+            upsert=True, return_document=ReturnDocument.AFTER,
+        )["seq"]
+        self.snapshots.insert_one({
+            "_id": version,
+            "created_at": datetime.datetime.utcnow(),
+            **columns,
+        })
+        return version, latest
+
+    def read_standings(self, collection):
+        """The standings columns of a ranked collection, read in rank order."""
+        columns = {"athlete_ids": [], "total_points": [], "ranks": []}
+        projection = {"_id": 0, "AthleteID": 1, "TotalPoints": 1, "Rank": 1}
+        for doc in collection.find({}, projection).sort("Rank", ASCENDING):
+            columns["athlete_ids"].append(doc["AthleteID"])
+            columns["total_points"].append(doc.get("TotalPoints", 0))
+            columns["ranks"].append(doc["Rank"])
+        return columns
+
+    def find(self, as_of):
+        """The snapshot with version `as_of`, or the latest one taken at or before it."""
+        if isinstance(as_of, int):
+            return self.snapshots.find_one({"_id": as_of})
+        return self.snapshots.find_one({"created_at": {"$lte": as_of}}, sort=[("created_at", DESCENDING)])
+
+    def versions(self):
+        return [
+            {"version": s["_id"], "created_at": s["created_at"].isoformat(), "count": len(s["athlete_ids"])}
+            for s in self.snapshots.find({}, {"athlete_ids": 1, "created_at": 1}).sort("_id", DESCENDING)
+        ]
@@ -0,0 +1,136 @@
+"""
+Response formats for the GET routes.
+
+    format=json             rows, one object per document (the default)
+    format=columns          one array per field: {"Athlete": [...], "HR": [...]}
+    format=msgpack          rows, MessagePack
+    format=msgpack-columns  columns, MessagePack
+
+Instead of format=, the client can ask for the media type in its Accept
+header (application/json, application/vnd.ausl.columns+json,
+application/msgpack, application/vnd.ausl.columns+msgpack). The columnar
+shapes name every field once instead of once per row; missing fields are
+null. The stat routes still stream NDJSON with format=ndjson (see reads.py).
+
+JSON is encoded with orjson when it is installed, and MessagePack needs the
+msgpack package; both are optional.
+"""
+
+import datetime
+import json
+from collections import namedtuple
+from operator import itemgetter
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # the standard library encoder is used instead
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # MessagePack is then not offered
+    msgpack = None
+
+Format = namedtuple("Format", ["mimetype", "columnar", "binary"])
+
+FORMATS = {
+    "json": Format("application/json", False, False),
+    "columns": Format("application/vnd.ausl.columns+json", True, False),
+    "msgpack": Format("application/msgpack", False, True),
+    "msgpack-columns": Format("application/vnd.ausl.columns+msgpack", True, True),
+}
+MIMETYPES = {f.mimetype for f in FORMATS.values()}
+
+
+def _default(value):
+    # what jsonify did for dates; ObjectIds and anything else become strings
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return http_date(value)
+    return str(value)
+
+
+def dumps(value):
+    """Compact JSON as UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default,
+                            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JSONProvider(DefaultJSONProvider):
+    """jsonify() through dumps() above (app.json = JSONProvider(app))."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        body = dumps(self._prepare_response_obj(args, kwargs))
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def available(name):
+    return not FORMATS[name].binary or msgpack is not None
+
+
+def negotiate(args, accept_mimetypes=None):
+    """The format asked for by format= or Accept; raises ValueError with a client-facing message."""
+    name = args.get("format")
+    if name and name != "ndjson":
+        if name not in FORMATS:
+            raise ValueError(f"format must be one of: ndjson, {', '.join(FORMATS)}")
+        if not available(name):
+            raise ValueError(f"format={name} is not available on this server")
+        return name
+    if accept_mimetypes is None:
+        return "json"
+    offered = [f.mimetype for n, f in FORMATS.items() if available(n)]
+    if msgpack is not None:
+        offered.append("application/x-msgpack")
+    best = accept_mimetypes.best_match(offered, default="application/json")
+    if best == "application/x-msgpack":
+        return "msgpack"
+    return next(n for n, f in FORMATS.items() if f.mimetype == best)
+
+
+def requested(request):
+    """negotiate() for the request, "json" if the request is invalid (the route reports that)."""
+    try:
+        return negotiate(request.args, request.accept_mimetypes)
+    except ValueError:
+        return "json"
+
+
+def columns(rows):
+    """One list per field, in first-seen order; None where a row lacks the field."""
+    if not rows:
+        return {}
+    fields = list(rows[0])
+    # usually every row has the fields of the first one: transpose them at C speed
+    if len(fields) > 1 and sum(map(len, rows)) == len(fields) * len(rows):
+        try:
+            return dict(zip(fields, map(list, zip(*map(itemgetter(*fields), rows)))))
+        except KeyError:
+            pass
+    fields = dict.fromkeys(field for row in rows for field in row)
+    return {field: [row.get(field) for row in rows] for field in fields}
+
+
+def render(data, name):
+    """
+    (body, mimetype) of `data` in format `name`. `data` is a list of
+    documents, or a dict of such lists (/api/batch), shaped per list.
+    """
+    fmt = FORMATS[name]
+    if fmt.columnar:
+        data = {k: columns(v) for k, v in data.items()} if isinstance(data, dict) else columns(data)
+    if fmt.binary:
+        return msgpack.packb(data, default=_default, use_bin_type=True), fmt.mimetype
+    return dumps(data), fmt.mimetype
@@ -1,6 +1,6 @@
 'use client';
 
-import { LeaderboardRow } from '../types';
+import { LeaderboardQuery, LeaderboardRow } from '../types';
 
 // Use the public API base (must start with NEXT_PUBLIC_ to be available client-side)
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || '/api';
@@ -8,16 +8,32 @@ const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || '/api';
 interface FetchOptions {
   retries?: number;
   timeout?: number;
+  query?: LeaderboardQuery;  // filtered/sorted/paged on the backend
+}
+
+function leaderboardSearch(query?: LeaderboardQuery): string {
+  if (!query) return '';
+  const params = new URLSearchParams();
+  if (query.position?.length) params.set('position', query.position.join(','));
+  if (query.minGames !== undefined) params.set('min_games', String(query.minGames));
+  if (query.category) params.set('category', query.category);
+  if (query.sort) params.set('sort', query.sort);
+  if (query.order) params.set('order', query.order);
+  if (query.limit !== undefined) params.set('limit', String(query.limit));
+  if (query.offset !== undefined) params.set('offset', String(query.offset));
+  const search = params.toString();
+  return search ? `?${search}` : '';
 }
 
 /**
  * Fetches the leaderboard data from the Next.js API route.
  * This function handles communication with the backend through the middleware.
- * @returns Array of LeaderboardRow objects sorted by total points
+ * Pass `options.query` to have the backend filter, sort and page the rows.
+ * @returns Array of LeaderboardRow objects sorted by total points (or the query's sort)
  * @throws Error if the fetch fails after retries
  */
 export async function getLeaderboard(options: FetchOptions = {}): Promise<LeaderboardRow[]> {
-  const { retries = 1, timeout = 30000 } = options;
+  const { retries = 1, timeout = 30000, query } = options;
 
   let lastError: Error | null = null;
 
@@ -26,7 +42,7 @@ export async function getLeaderboard(options: FetchOptions = {}): Promise<Leader
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), timeout);
 
-      const response = await fetch(`${API_BASE_URL}/leaderboard`, {
+      const response = await fetch(`${API_BASE_URL}/leaderboard${leaderboardSearch(query)}`, {
         method: 'GET',
         headers: {
           'Content-Type': 'application/json',
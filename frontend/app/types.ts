@@ -1,6 +1,7 @@
 export type LeaderboardRow = {
+  athleteId?: number | null;  // canonical athlete ID; from the leaderboard backend route
   rank: number;  // athlete's rank; calculated on frontend
-  change: string;  // rank change indicator, e.g., "+1", "–", "-2"; from player_info backend route
+  change: string;  // rank change indicator, e.g., "+1", "–", "-2"; from the leaderboard snapshots on the backend
   athlete: string;  // athlete's name; from all the routes
   headshot: string;  // URL to athlete's headshot image; from player_info backend route
   bio_url: string;  // URL to athlete's bio page; from player_info backend route
@@ -39,3 +40,14 @@ export type LeaderboardRow = {
 };
 
 
+
+// Server-side filters for the leaderboard route (see Backend/leaderboard.py)
+export type LeaderboardQuery = {
+  position?: string[];  // e.g. ["P", "SS"]
+  minGames?: number;
+  category?: 'total' | 'stat' | 'mvp' | 'win';  // only athletes with points in it, sorted by them
+  sort?: 'rank' | 'athlete' | 'games' | 'totalPts' | 'statPts' | 'mvpPts' | 'winPts';
+  order?: 'asc' | 'desc';
+  limit?: number;  // top-N
+  offset?: number;
+};
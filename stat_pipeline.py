@@ -0,0 +1,293 @@
+"""
+stat_pipeline.py
+Streams extracted StatBroadcast box scores into the backend.
+
+Reads the per-page JSON Lines written by table_extractor.py, maps the
+box-score columns onto the players_hitting / pitching_players schema and
+POSTs each page as one game to the backend's /api/games route. That route
+bulk-upserts the per-athlete stats with $inc and rescores only the athletes
+in the game. The game_id is the StatBroadcast game id from the page URL
+(falling back to the URL or the saved file name), never the content hash: a
+page that is fetched again after it changed is still the same game, and the
+backend answers 409 instead of adding its stats a second time. Player names
+are matched against the backend's athlete registry (GET /api/athletes), so
+"Sierra Romero" is sent as the registered "Romero, Si", not "Romero, S".
+
+Usage:
+    pip install requests
+    python stat_pipeline.py output_json/594271.html_tables.jsonl
+    python stat_pipeline.py --follow output_json/*_tables.jsonl   # keep tailing
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:5000")
+OFFSETS_FILE = Path("output_json") / "pipeline_offsets.json"
+POLL_INTERVAL = 5.0  # seconds, in --follow mode
+
+# StatBroadcast column -> backend column; columns the backend has no field for
+# (e.g. BF, batters faced) are left out
+HITTING_COLUMNS = {
+    "AB": "AB", "R": "R", "H": "H", "RBI": "RBI", "2B": "2B", "3B": "3B",
+    "HR": "HR", "BB": "BB", "SB": "SB", "CS": "CS", "HBP": "HP", "HP": "HP",
+    "SF": "SF", "SH": "SH", "SAC": "SH", "SO": "SO", "K": "SO", "TB": "TB",
+}
+PITCHING_COLUMNS = {
+    "H": "H", "ER": "ER", "BB": "BB", "SO": "SO", "K": "SO", "HR": "HR",
+    "HBP": "HP", "HP": "HP", "WP": "WP", "S": "S",
+}
+NAME_COLUMNS = ("Player", "Name", "Pitcher", "Batter", "Hitter")
+DECISIONS = {"W": "W-L", "L": "L", "S": "SV", "SV": "SV"}
+
+
+def _key(name):
+    # same normalization as the backend's athletes.normalize_name
+    name = re.sub(r"\s+", " ", str(name or "")).strip().lower()
+    return name.rstrip(". ")
+
+
+class AthleteNames:
+    """
+    Maps scraped names onto the names the backend's athlete registry knows.
+
+    The league keys athletes as "Last, F" but extends the first name where
+    that clashes ("Romero, Si" and "Romero, Sy"). A scraped "Sierra Romero"
+    becomes the registered athlete whose alias is the longest prefix of
+    "sierra"; athletes the registry doesn't know get the shortest first name
+    prefix no other athlete of that last name (known, or on the same page)
+    shares.
+    """
+
+    def __init__(self, athletes=()):
+        self.first_names = {}  # last name key -> {first name key: registered name}
+        for athlete in athletes:
+            for alias in athlete.get("aliases", []):
+                last, _, first = alias.partition(", ")
+                self.first_names.setdefault(last, {})[first] = athlete["name"]
+
+    @classmethod
+    def load(cls, backend_url=BACKEND_URL):
+        response = requests.get(f"{backend_url}/api/athletes")
+        response.raise_for_status()
+        return cls(response.json())
+
+    def _match(self, known, last, first):
+        first_key = _key(first)
+        # the registered spelling: the full first name or the longest prefix of it
+        prefixes = [f for f in known if f and first_key.startswith(f)]
+        if prefixes:
+            return known[max(prefixes, key=len)]
+        # only an initial (or a shorter spelling) was scraped: fine if it fits one athlete
+        longer = {known[f] for f in known if f.startswith(first_key)}
+        if len(longer) == 1:
+            return longer.pop()
+        if longer:
+            print(f"⚠ Skipping {first} {last}: could be any of {'; '.join(sorted(longer))}")
+            return ""
+        return None
+
+    def resolve(self, people):
+        """{(last, first): registered or new name, "" if ambiguous} for (last, first) pairs."""
+        names, unknown = {}, {}
+        for last, first in people:
+            known = self.first_names.setdefault(_key(last), {})
+            name = self._match(known, last, first)
+            if name is None:
+                unknown.setdefault(_key(last), {})[_key(first)] = (last, first)
+            else:
+                names[last, first] = name
+
+        for last_key, new in unknown.items():
+            known = self.first_names[last_key]
+            taken = set(known) | set(new)
+            registered = {}
+            for first_key, (last, first) in new.items():
+                others = taken - {first_key}
+                length = 1
+                while length < len(first_key) and any(f.startswith(first_key[:length]) for f in others):
+                    length += 1
+                names[last, first] = f"{last}, {first[:length]}" if first else last
+                registered[first_key[:length]] = names[last, first]
+            known.update(registered)  # later pages resolve to the same names
+        return names
+
+
+def split_name(raw):
+    """"#7 Binford, Aleshia (W, 2-1)" -> ("Binford", "Aleshia", ["W"])"""
+    raw = str(raw)
+    decisions = re.findall(r"\b(W|L|SV?)\b(?=[^()]*\))", raw)
+    name = re.sub(r"\(.*?\)", "", raw)
+    name = re.sub(r"^\s*#?\d+\s*", "", name).strip()
+    if "," in name:
+        last, first = (part.strip() for part in name.split(",", 1))
+    elif " " in name:
+        first, last = name.rsplit(" ", 1)
+    else:
+        last, first = name, ""
+    return last, first, decisions
+
+
+def athlete_name(raw, names=None):
+    """
+    "#7 Binford, Aleshia (W, 2-1)" -> ("Binford, A", ["W"]), with the name
+    the registry knows (see AthleteNames); "" if it can't be told apart.
+    """
+    names = names if names is not None else AthleteNames()
+    last, first, decisions = split_name(raw)
+    return (names.resolve([(last, first)])[last, first] if last else ""), decisions
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0
+    return int(number) if number.is_integer() else number
+
+
+def _name_column(columns):
+    for column in columns:
+        if column in NAME_COLUMNS:
+            return column
+    return columns[0] if columns else None
+
+
+def _player_rows(tables):
+    """(is pitching, row, raw player name) for every player row of the box-score tables."""
+    for table in tables:
+        columns = table.get("columns", [])
+        name_col = _name_column(columns)
+        is_pitching = "IP" in columns
+        if not name_col or not (is_pitching or "AB" in columns):
+            continue  # not a box-score table
+
+        for row in table.get("rows", []):
+            raw_name = row.get(name_col)
+            if not raw_name or str(raw_name).strip().lower() in ("totals", "total", "team"):
+                continue
+            yield is_pitching, row, raw_name
+
+
+def page_to_game(record, names=None):
+    """Map one extracted page onto the /api/games payload."""
+    names = names if names is not None else AthleteNames()
+    athletes = {}
+
+    def entry(name):
+        return athletes.setdefault(name, {"Athlete": name, "hitting": {}, "pitching": {}})
+
+    rows = list(_player_rows(record.get("tables", [])))
+    # the page's players are resolved together, so two new athletes with the
+    # same initial don't end up under one name
+    people = {split_name(raw_name)[:2] for _, _, raw_name in rows}
+    resolved = names.resolve(sorted(p for p in people if p[0]))
+
+    for is_pitching, row, raw_name in rows:
+        last, first, decisions = split_name(raw_name)
+        name = resolved.get((last, first))
+        if not name:
+            continue
+
+        if is_pitching:
+            stats = entry(name)["pitching"]
+            stats["IP"] = _number(row.get("IP"))
+            for src, dst in PITCHING_COLUMNS.items():
+                if src in row:
+                    stats[dst] = stats.get(dst, 0) + _number(row[src])
+            for decision in decisions:
+                stats[DECISIONS[decision]] = stats.get(DECISIONS[decision], 0) + 1
+            stats["G"] = 1
+        else:
+            stats = entry(name)["hitting"]
+            for src, dst in HITTING_COLUMNS.items():
+                if src in row:
+                    stats[dst] = stats.get(dst, 0) + _number(row[src])
+            stats["1B"] = max(0, stats.get("H", 0) - stats.get("2B", 0)
+                              - stats.get("3B", 0) - stats.get("HR", 0))
+            stats["PA"] = sum(stats.get(c, 0) for c in ("AB", "BB", "HP", "SF", "SH"))
+            stats["G"] = 1
+
+    return list(athletes.values())
+
+
+def page_game_id(record):
+    """
+    Stable identity of the game on an extracted page:
+    "https://stats.statbroadcast.com/broadcast/?id=594271" -> "statbroadcast:594271".
+    """
+    url = record.get("url")
+    if url:
+        ids = parse_qs(urlparse(url).query).get("id")
+        if ids and ids[0]:
+            return f"statbroadcast:{ids[0]}"
+        return url
+    return record.get("file")
+
+
+def send_game(game_id, athletes, backend_url=BACKEND_URL):
+    response = requests.post(f"{backend_url}/api/games",
+                             json={"game_id": game_id, "athletes": athletes})
+    if response.status_code == 409:
+        print(f"⏭️  {game_id} already applied")
+        return
+    response.raise_for_status()
+    print(f"✓ {game_id}: {len(athletes)} athletes -> {response.json().get('updated')}")
+
+
+def load_offsets():
+    if OFFSETS_FILE.exists():
+        return json.loads(OFFSETS_FILE.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_offsets(offsets):
+    OFFSETS_FILE.parent.mkdir(exist_ok=True)
+    OFFSETS_FILE.write_text(json.dumps(offsets), encoding="utf-8")
+
+
+def process_new_lines(path, offsets, backend_url=BACKEND_URL, names=None):
+    """Send every complete line of `path` past its saved offset."""
+    names = names if names is not None else AthleteNames.load(backend_url)
+    key = str(path)
+    with open(path, encoding="utf-8") as f:
+        f.seek(offsets.get(key, 0))
+        while True:
+            line = f.readline()
+            if not line.endswith("\n"):
+                break  # nothing new, or the extractor is mid-write
+            record = json.loads(line)
+            athletes = page_to_game(record, names)
+            if athletes:
+                send_game(page_game_id(record), athletes, backend_url)
+            offsets[key] = f.tell()
+            save_offsets(offsets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send extracted box scores to the backend")
+    parser.add_argument("files", nargs="+", help="*_tables.jsonl files from table_extractor.py")
+    parser.add_argument("--follow", action="store_true", help="keep polling the files for new pages")
+    parser.add_argument("--backend-url", default=BACKEND_URL)
+    args = parser.parse_args()
+
+    offsets = load_offsets()
+    while True:
+        names = AthleteNames.load(args.backend_url)  # picks up athletes registered since the last pass
+        for path in args.files:
+            if Path(path).exists():
+                process_new_lines(path, offsets, args.backend_url, names)
+        if not args.follow:
+            break
+        time.sleep(POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+table_extractor.py
+Extracts the stat tables from saved StatBroadcast HTML pages.
+
+Pages are parsed across a process pool and each page's tables are appended
+to a JSON Lines file as soon as they are ready, so memory stays bounded no
+matter how many pages are processed. The SHA-256 of every parsed page is
+recorded in output_json/parsed_hashes.txt and pages with a known hash are
+skipped on the next run.
+
+Usage:
+    pip install pandas lxml
+    python table_extractor.py                       # every page in output_html/
+    python table_extractor.py --out output_json/594271_tables.jsonl page1.html page2.html
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+
+OUTPUT_HTML = Path("output_html")
+OUTPUT_JSON = Path("output_json")
+URL_INDEX = OUTPUT_HTML / "index.jsonl"          # written by web_scraper.py
+PARSED_HASHES = OUTPUT_JSON / "parsed_hashes.txt"
+DEFAULT_OUT = OUTPUT_JSON / "tables.jsonl"
+
+def extract_tables_from_html(html):
+    """Use pandas to extract tables as list of dicts."""
+    tables_data = []
+    try:
+        tables = pd.read_html(StringIO(html))
+        for i, df in enumerate(tables, start=1):
+            # multi-row headers come back as tuples, which can't be JSON keys
+            df.columns = [" ".join(map(str, c)) if isinstance(c, tuple) else str(c)
+                          for c in df.columns]
+            tables_data.append({
+                "table_index": i,
+                "columns": df.columns.tolist(),
+                "rows": df.fillna("").to_dict(orient="records")
+            })
+    except ValueError:
+        # no tables found
+        pass
+    return tables_data
+
+def page_hash(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def extract_file(path):
+    """Worker: parse one saved page."""
+    html = Path(path).read_text(encoding="utf-8")
+    return extract_tables_from_html(html)
+
+def load_url_index():
+    urls = {}
+    if URL_INDEX.exists():
+        with open(URL_INDEX, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                urls[entry["file"]] = entry["url"]
+    return urls
+
+def load_parsed_hashes(path=PARSED_HASHES):
+    if not Path(path).exists():
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+def run_extraction(paths, out_path=DEFAULT_OUT, workers=None, state_path=PARSED_HASHES):
+    """
+    Parse `paths` in a process pool, skipping pages parsed before, and
+    append one JSON line per page to `out_path`. Returns the number of
+    pages parsed.
+    """
+    OUTPUT_JSON.mkdir(exist_ok=True)
+    parsed = load_parsed_hashes(state_path)
+    urls = load_url_index()
+
+    todo = []
+    for path in paths:
+        digest = page_hash(path)
+        if digest in parsed:
+            continue
+        parsed.add(digest)  # also dedupes identical pages within this run
+        todo.append((Path(path), digest))
+    print(f"{len(todo)} new pages to parse ({len(paths) - len(todo)} skipped)")
+
+    workers = workers or os.cpu_count() or 1
+    count = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(out_path, "a", encoding="utf-8") as out, \
+            open(state_path, "a", encoding="utf-8") as state:
+        pending = {}
+        queue = iter(todo)
+
+        def submit_next():
+            item = next(queue, None)
+            if item is not None:
+                pending[pool.submit(extract_file, item[0])] = item
+
+        # keep a bounded number of pages in flight
+        for _ in range(workers * 2):
+            submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, digest = pending.pop(future)
+                tables_data = future.result()
+                out.write(json.dumps({
+                    "url": urls.get(path.name),
+                    "file": path.name,
+                    "sha256": digest,
+                    "tables_found": len(tables_data),
+                    "tables": tables_data,
+                }, default=str) + "\n")
+                out.flush()
+                # record the hash only once the page's line is written
+                state.write(digest + "\n")
+                state.flush()
+                count += 1
+                submit_next()
+
+    print(f"Parsed {count} pages into {out_path}")
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract stat tables from saved HTML pages")
+    parser.add_argument("pages", nargs="*", help="HTML files (default: every page in output_html/)")
+    parser.add_argument("--out", default=str(DEFAULT_OUT), help="JSON Lines output file")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    pages = args.pages or sorted(str(p) for p in OUTPUT_HTML.glob("*.html"))
+    run_extraction(pages, args.out, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,23 @@ Usage:
     pip install playwright bs4 pandas
     playwright install
     python scrape_statbroadcast_event.py
+    python scrape_statbroadcast_event.py --async --concurrency 8
+
+Pages already saved in output_html/ are read from disk instead of being
+fetched again (pass --refresh to re-fetch them).
 """
 
+import argparse
+import asyncio
 import os
 import time
 import json
 from urllib.parse import urljoin, urlparse
 from pathlib import Path
 from bs4 import BeautifulSoup
-import pandas as pd
+from playwright.async_api import async_playwright
 from playwright.sync_api import sync_playwright
+from table_extractor import URL_INDEX, run_extraction
 
 # Event URL (change if needed)
 EVENT_URL = "http://archive.statbroadcast.com/594271.html"
@@ -29,6 +36,7 @@ OUTPUT_JSON.mkdir(exist_ok=True)
 HEADLESS = True
 NAV_TIMEOUT = 30000  # ms
 PAUSE_BETWEEN = 1.0  # seconds
+CONCURRENCY = 4      # browser contexts in async mode
 
 def safe_filename_from_url(url: str) -> str:
     parts = urlparse(url)
@@ -37,6 +45,24 @@ def safe_filename_from_url(url: str) -> str:
         fname += "_" + parts.query.replace("&", "_").replace("=", "-")
     return "".join(c if c.isalnum() or c in "-._" else "_" for c in fname)[:200]
 
+def cache_path(url: str) -> Path:
+    return OUTPUT_HTML / (safe_filename_from_url(url) + ".html")
+
+def save_html(url: str, html: str) -> Path:
+    path = cache_path(url)
+    path.write_text(html, encoding="utf-8")
+    # lets the extraction stage map saved files back to their URL
+    with open(URL_INDEX, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"url": url, "file": path.name}) + "\n")
+    return path
+
+def read_cached(url: str):
+    """Return the saved HTML for `url`, or None if it was never fetched."""
+    path = cache_path(url)
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    return None
+
 def collect_stat_links(html, base_url):
     """Collect all links that likely contain stats tables."""
     soup = BeautifulSoup(html, "html.parser")
@@ -54,65 +80,112 @@ def collect_stat_links(html, base_url):
             seen.add(l)
     return out
 
-def extract_tables_from_html(html):
-    """Use pandas to extract tables as list of dicts."""
-    tables_data = []
+class HostRateLimiter:
+    """Spaces out requests to the same host by at least `interval` seconds."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.locks = {}
+        self.last = {}
+
+    async def wait(self, url):
+        host = urlparse(url).netloc
+        lock = self.locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self.last.get(host, 0) + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.last[host] = time.monotonic()
+
+async def fetch_html(pages, limiter, url, refresh=False, wait_until="networkidle"):
+    """Fetch `url` with a page from the pool, or serve it from output_html/."""
+    if not refresh:
+        html = read_cached(url)
+        if html is not None:
+            print("Cached:", url)
+            return html
+
+    page = await pages.get()
     try:
-        tables = pd.read_html(html)
-        for i, df in enumerate(tables, start=1):
-            tables_data.append({
-                "table_index": i,
-                "columns": df.columns.tolist(),
-                "rows": df.fillna("").to_dict(orient="records")
-            })
-    except ValueError:
-        # no tables found
-        pass
-    return tables_data
-
-def main():
+        await limiter.wait(url)
+        print("Fetching:", url)
+        await page.goto(url, timeout=NAV_TIMEOUT, wait_until=wait_until)
+        html = await page.content()
+    finally:
+        pages.put_nowait(page)
+    save_html(url, html)
+    return html
+
+async def async_main(event_url=EVENT_URL, concurrency=CONCURRENCY, interval=PAUSE_BETWEEN,
+                     refresh=False, wait_until="networkidle"):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=HEADLESS)
+
+        # a bounded pool of isolated contexts, one page each
+        pages = asyncio.Queue()
+        for _ in range(max(1, concurrency)):
+            context = await browser.new_context()
+            pages.put_nowait(await context.new_page())
+        limiter = HostRateLimiter(interval)
+
+        event_html = await fetch_html(pages, limiter, event_url, refresh, wait_until)
+        stat_links = collect_stat_links(event_html, event_url)
+        print(f"Found {len(stat_links)} stat links")
+
+        await asyncio.gather(*(fetch_html(pages, limiter, link, refresh, wait_until)
+                               for link in stat_links))
+        await browser.close()
+
+    # Extraction runs as its own stage over the saved pages
+    summary_fname = safe_filename_from_url(event_url) + "_tables.jsonl"
+    run_extraction([cache_path(link) for link in stat_links], OUTPUT_JSON / summary_fname)
+    print("Done! Saved HTML and JSON tables to:", OUTPUT_HTML, OUTPUT_JSON)
+
+def main(event_url=EVENT_URL):
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=HEADLESS)
         context = browser.new_context()
         page = context.new_page()
 
         # Step 1: visit event page
-        print("Visiting event page:", EVENT_URL)
-        page.goto(EVENT_URL, timeout=NAV_TIMEOUT, wait_until="networkidle")
+        print("Visiting event page:", event_url)
+        page.goto(event_url, timeout=NAV_TIMEOUT, wait_until="networkidle")
         event_html = page.content()
-        event_fname = safe_filename_from_url(EVENT_URL) + ".html"
-        (OUTPUT_HTML / event_fname).write_text(event_html, encoding="utf-8")
+        save_html(event_url, event_html)
 
         # Step 2: collect stat links
-        stat_links = collect_stat_links(event_html, EVENT_URL)
+        stat_links = collect_stat_links(event_html, event_url)
         print(f"Found {len(stat_links)} stat links")
 
-        all_results = []
         for i, link in enumerate(stat_links, start=1):
             print(f"[{i}/{len(stat_links)}] Visiting stat page: {link}")
             page.goto(link, timeout=NAV_TIMEOUT, wait_until="networkidle")
-            html = page.content()
-            fname = safe_filename_from_url(link) + ".html"
-            (OUTPUT_HTML / fname).write_text(html, encoding="utf-8")
-
-            # Step 3: extract tables
-            tables_data = extract_tables_from_html(html)
-            result = {
-                "url": link,
-                "tables_found": len(tables_data),
-                "tables": tables_data
-            }
-            all_results.append(result)
+            save_html(link, page.content())
 
             time.sleep(PAUSE_BETWEEN)
 
-        # Step 4: save summary JSON
-        summary_fname = safe_filename_from_url(EVENT_URL) + "_tables.json"
-        with open(OUTPUT_JSON / summary_fname, "w", encoding="utf-8") as f:
-            json.dump(all_results, f, indent=2)
-        print("Done! Saved HTML and JSON tables to:", OUTPUT_HTML, OUTPUT_JSON)
-
         browser.close()
 
+    # Step 3: extract tables from the saved pages (see table_extractor.py)
+    summary_fname = safe_filename_from_url(event_url) + "_tables.jsonl"
+    run_extraction([cache_path(link) for link in stat_links], OUTPUT_JSON / summary_fname)
+    print("Done! Saved HTML and JSON tables to:", OUTPUT_HTML, OUTPUT_JSON)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape the stat tables of a StatBroadcast event")
+    parser.add_argument("--event-url", default=EVENT_URL)
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="fetch stat pages concurrently")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--interval", type=float, default=PAUSE_BETWEEN,
+                        help="minimum seconds between requests to the same host")
+    parser.add_argument("--refresh", action="store_true", help="ignore pages saved in output_html/")
+    parser.add_argument("--wait-until", default="networkidle",
+                        choices=["load", "domcontentloaded", "networkidle"])
+    args = parser.parse_args()
+
+    if args.use_async:
+        asyncio.run(async_main(args.event_url, args.concurrency, args.interval,
+                               args.refresh, args.wait_until))
+    else:
+        main(args.event_url)
\ No newline at end of file